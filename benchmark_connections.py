@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark of the connection stores
+
+Seeds persistent_wordpress_connections (SQLite) and
+persistent_service_connections (JSON file) with synthetic users and
+connections in a temp directory, times the public store functions and
+reports time per call and peak Python memory (tracemalloc) per operation.
+
+Usage:
+    python benchmark_connections.py --sizes 1000,10000,100000
+    python benchmark_connections.py --sizes 10000 --stores service --json results.json
+
+Sizes are numbers of connections; users get --per-user connections each.
+The real data directory is never touched.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from cryptography.fernet import Fernet
+
+# The stores read their key at import time, use a throwaway one unless set
+os.environ.setdefault("WP_ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+import persistent_service_connections as service_store
+import persistent_wordpress_connections as wp_store
+
+STORES = ("wordpress", "service")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def user_name(number: int) -> str:
+    return f"user{number:06d}"
+
+
+def measure(
+    name: str,
+    operation: Callable[[], Any],
+    iterations: int,
+    budget: float
+) -> Dict[str, Any]:
+    """
+    Time an operation, then trace one extra call for its peak memory
+    
+    Args:
+        name: Operation name for the report
+        operation: Callable running one call
+        iterations: Maximum number of timed calls
+        budget: Stop timing after this many seconds (at least one call runs)
+    
+    Returns:
+        Dictionary with call count, mean/p50/p95/max ms and peak KiB
+    """
+    durations = []
+    deadline = time.perf_counter() + budget
+    while len(durations) < iterations and (not durations or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - started)
+    
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    durations.sort()
+    return {
+        "operation": name,
+        "calls": len(durations),
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+        "max_ms": round(durations[-1] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+# ========================================
+# WORDPRESS CONNECTIONS (SQLite)
+# ========================================
+
+def seed_wordpress(work_dir: Path, size: int, per_user: int) -> int:
+    """
+    Point the WordPress store at a fresh database and bulk insert connections
+    
+    Every row gets the same encrypted password; decrypting it costs the same
+    as decrypting distinct ones and keeps seeding fast.
+    
+    Returns:
+        Number of users
+    """
+    wp_store.DATABASE_FILE = work_dir / f"wordpress_connections_{size}.db"
+    wp_store.CONNECTIONS_FILE = work_dir / "wordpress_connections.json"
+    conn = wp_store._get_db()
+    
+    password = wp_store._encrypt_password("application password 1234 abcd")
+    now = datetime.now().isoformat()
+    users = max(size // per_user, 1)
+    rows = []
+    for index in range(size):
+        owner = user_name(index % users)
+        number = index // users + 1
+        rows.append((
+            owner, f"{owner}_{number}", f"Site {index}", f"https://site{index}.example.com",
+            "admin", password, "en", "", now, now, 1, None
+        ))
+    columns = ("owner",) + wp_store._CONNECTION_FIELDS
+    with wp_store._transaction(conn):
+        conn.executemany(
+            f"INSERT INTO wordpress_connections ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+    return users
+
+
+def bench_wordpress(users: int, per_user: int, rng: random.Random, iterations: int, budget: float) -> List[Dict[str, Any]]:
+    """Run the WordPress store operations"""
+    def pick():
+        owner = user_name(rng.randrange(users))
+        return owner, f"{owner}_{rng.randrange(per_user) + 1}"
+    
+    def add():
+        owner = user_name(rng.randrange(users))
+        wp_store.add_wordpress_connection(owner, "Bench site", "https://bench.example.com", "admin", "secret")
+    
+    def update():
+        owner, connection_id = pick()
+        wp_store.update_connection(owner, connection_id, site_description=f"updated {time.time()}")
+    
+    def last_used_many():
+        now = datetime.now().isoformat()
+        wp_store.update_last_used_many({pick(): now for _ in range(100)})
+    
+    return [
+        measure("get_all_enabled_connections", wp_store.get_all_enabled_connections, iterations, budget),
+        measure("get_all_enabled_connections(decrypt=False)",
+                lambda: wp_store.get_all_enabled_connections(decrypt=False), iterations, budget),
+        measure("get_user_connections", lambda: wp_store.get_user_connections(pick()[0]), iterations, budget),
+        measure("get_connection", lambda: wp_store.get_connection(*pick()), iterations, budget),
+        measure("add_wordpress_connection", add, iterations, budget),
+        measure("update_connection", update, iterations, budget),
+        measure("update_last_used", lambda: wp_store.update_last_used(*pick()), iterations, budget),
+        measure("update_last_used_many(100)", last_used_many, iterations, budget),
+    ]
+
+
+# ========================================
+# SERVICE CONNECTIONS (JSON file)
+# ========================================
+
+def seed_service(work_dir: Path, size: int, per_user: int) -> int:
+    """
+    Point the service store at a fresh JSON file with Kie.ai connections
+    
+    Returns:
+        Number of users
+    """
+    service_store.CONNECTIONS_FILE = work_dir / f"service_connections_{size}.json"
+    api_key = service_store._encrypt("kie-api-key-0123456789abcdef")
+    now = datetime.now().isoformat()
+    users = max(size // per_user, 1)
+    connections: Dict[str, Dict] = {}
+    for index in range(size):
+        owner = user_name(index % users)
+        user = connections.setdefault(owner, {"kie": {}, "wordstat": {}, "telegram": {}})
+        connection_id = f"{owner}_kie_{len(user['kie']) + 1}"
+        user["kie"][connection_id] = {
+            "connection_id": connection_id,
+            "connection_name": f"Kie {index}",
+            "api_key": api_key,
+            "description": "",
+            "created_at": now,
+            "enabled": True,
+            "last_used": None
+        }
+    service_store._save_connections(connections)
+    return users
+
+
+def bench_service(users: int, per_user: int, rng: random.Random, iterations: int, budget: float) -> List[Dict[str, Any]]:
+    """Run the service store operations (every call loads, and writes rewrite, the whole file)"""
+    def pick():
+        owner = user_name(rng.randrange(users))
+        return owner, f"{owner}_kie_{rng.randrange(per_user) + 1}"
+    
+    def add():
+        service_store.add_kie_connection(user_name(rng.randrange(users)), "Bench", "kie-key")
+    
+    def update():
+        owner, connection_id = pick()
+        service_store.update_kie_connection(owner, connection_id, description=f"updated {time.time()}")
+    
+    return [
+        measure("get_kie_connections", lambda: service_store.get_kie_connections(pick()[0]), iterations, budget),
+        measure("add_kie_connection", add, iterations, budget),
+        measure("update_kie_connection", update, iterations, budget),
+    ]
+
+
+def file_size_mb(path: Path) -> float:
+    """Size of a store file plus its SQLite WAL, in MB"""
+    total = 0
+    for candidate in (path, path.with_name(path.name + "-wal")):
+        if candidate.exists():
+            total += candidate.stat().st_size
+    return round(total / 2 ** 20, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale benchmark of the connection stores")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated connection counts")
+    parser.add_argument("--per-user", type=int, default=2, help="Connections per synthetic user")
+    parser.add_argument("--stores", default=",".join(STORES), help="Comma-separated stores: wordpress, service")
+    parser.add_argument("--iterations", type=int, default=200, help="Maximum timed calls per operation")
+    parser.add_argument("--budget", type=float, default=3.0, help="Seconds of timing per operation")
+    parser.add_argument("--slow-ms", type=float, default=100.0, help="Flag operations with p95 above this")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    stores = [store.strip() for store in args.stores.split(",") if store.strip()]
+    unknown = set(stores) - set(STORES)
+    if unknown:
+        parser.error(f"Unknown stores: {', '.join(sorted(unknown))}")
+    per_user = max(args.per_user, 1)
+    
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="bench-connections-") as tmp:
+        work_dir = Path(tmp)
+        for size in sizes:
+            for store in stores:
+                print(f"Seeding {store} store with {size} connections ...", flush=True)
+                started = time.perf_counter()
+                if store == "wordpress":
+                    users = seed_wordpress(work_dir, size, per_user)
+                    path = wp_store.DATABASE_FILE
+                    bench = bench_wordpress
+                else:
+                    users = seed_service(work_dir, size, per_user)
+                    path = service_store.CONNECTIONS_FILE
+                    bench = bench_service
+                seed_seconds = time.perf_counter() - started
+                
+                rng = random.Random(args.seed)
+                for row in bench(users, per_user, rng, args.iterations, args.budget):
+                    row.update(store=store, size=size, users=users)
+                    results.append(row)
+                print(f"  seeded in {seed_seconds:.1f}s, {users} users, file {file_size_mb(path)} MB", flush=True)
+    
+    print(f"\n{'store':9} {'size':>7} {'operation':44} {'calls':>6} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'peak KiB':>10}")
+    for row in results:
+        flag = "  SLOW" if row["p95_ms"] > args.slow_ms else ""
+        print(
+            f"{row['store']:9} {row['size']:>7} {row['operation']:44} {row['calls']:>6} "
+            f"{row['mean_ms']:>9} {row['p95_ms']:>9} {row['max_ms']:>9} {row['peak_kib']:>10}{flag}"
+        )
+    
+    if args.json_path:
+        report = {
+            "created": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "per_user": per_user,
+            "results": results
+        }
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
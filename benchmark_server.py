@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of the MCP server against a local WordPress stub
+
+Starts benchmark_wordpress_stub.py and mcp_sse_server.py (with its sites
+pointed at the stub and its data stores in a temp directory) as separate
+processes, drives tools/call load through /sse and the FastMCP /mcp endpoint,
+and reports requests per second, latency percentiles and server RSS.
+
+Results can be written as a baseline and later runs compared against it:
+
+    python benchmark_server.py --write-baseline data/benchmark_baseline.json
+    python benchmark_server.py --compare data/benchmark_baseline.json
+
+Nothing here talks to the real WordPress sites.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# Runs the server with both SQLite stores in a temp directory
+SERVER_BOOTSTRAP = """
+import sys
+from pathlib import Path
+import uvicorn
+import persistent_wordpress_connections
+import wordpress_post_mirror
+data_dir = Path(sys.argv[1])
+persistent_wordpress_connections.DATABASE_FILE = data_dir / "wordpress_connections.db"
+persistent_wordpress_connections.CONNECTIONS_FILE = data_dir / "wordpress_connections.json"
+wordpress_post_mirror.DATABASE_FILE = data_dir / "post_mirror.db"
+import mcp_sse_server
+uvicorn.run(mcp_sse_server.app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning", access_log=False)
+"""
+
+MCP_ACCEPT = "application/json, text/event-stream"
+
+
+def free_port() -> int:
+    """Pick a free local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_rss(pid: int) -> Dict[str, Optional[float]]:
+    """Current and peak RSS of a process in MB (Linux /proc, psutil elsewhere)"""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+        values = {}
+        for line in status.splitlines():
+            key, _, rest = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(rest.split()[0]) / 1024
+        return {"rss_mb": round(values.get("VmRSS", 0), 1), "peak_rss_mb": round(values.get("VmHWM", 0), 1)}
+    except OSError:
+        pass
+    try:
+        import psutil
+        return {"rss_mb": round(psutil.Process(pid).memory_info().rss / 2 ** 20, 1), "peak_rss_mb": None}
+    except Exception:
+        return {"rss_mb": None, "peak_rss_mb": None}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def wait_for_http(url: str, process: subprocess.Popen, timeout: float = 30):
+    """Wait until a URL answers or the process exits"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with code {process.returncode} before {url} came up")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def parse_sse_messages(text: str) -> List[Dict[str, Any]]:
+    """Decode the JSON data of 'message' events in an SSE body"""
+    messages = []
+    for block in text.replace("\r\n", "\n").split("\n\n"):
+        data = [line[5:].strip() for line in block.split("\n") if line.startswith("data:")]
+        event = next((line[6:].strip() for line in block.split("\n") if line.startswith("event:")), "message")
+        if data and event == "message":
+            try:
+                messages.append(json.loads("\n".join(data)))
+            except ValueError:
+                pass
+    return messages
+
+
+class LoadResult:
+    """Latencies and errors of one load run"""
+    
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.tool_failures = 0
+        self.bytes = 0
+    
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        total = len(latencies) + self.errors
+        
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+        
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "tool_failures": self.tool_failures,
+            "error_rate": round(self.errors / total, 4) if total else 0,
+            "rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+            "p50_ms": ms(percentile(latencies, 0.50)),
+            "p95_ms": ms(percentile(latencies, 0.95)),
+            "p99_ms": ms(percentile(latencies, 0.99)),
+            "max_ms": ms(latencies[-1] if latencies else None),
+            "mean_response_bytes": round(self.bytes / len(latencies)) if latencies else 0
+        }
+
+
+def tool_result_ok(response: Dict[str, Any]) -> Tuple[bool, bool]:
+    """(protocol ok, tool reported success) of a tools/call response"""
+    if "error" in response:
+        return False, False
+    result = response.get("result", {})
+    if result.get("isError"):
+        return True, False
+    try:
+        payload = json.loads(result["content"][0]["text"])
+        return True, bool(payload.get("success", True))
+    except (KeyError, IndexError, ValueError, TypeError):
+        return True, True
+
+
+async def sse_worker(client: httpx.AsyncClient, base_url: str, call: Dict[str, Any], deadline: float, result: LoadResult):
+    """Send tools/call requests to POST /sse until the deadline"""
+    request_id = 0
+    while time.monotonic() < deadline:
+        request_id += 1
+        body = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": call}
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{base_url}/sse", json=body)
+            response.raise_for_status()
+            messages = [message for message in parse_sse_messages(response.text) if message.get("id") == request_id]
+            if not messages:
+                raise ValueError("No response message")
+            ok, success = tool_result_ok(messages[0])
+        except (httpx.HTTPError, ValueError):
+            result.errors += 1
+            continue
+        if not ok:
+            result.errors += 1
+            continue
+        result.latencies.append(time.perf_counter() - started)
+        result.bytes += len(response.content)
+        if not success:
+            result.tool_failures += 1
+
+
+async def mcp_post(client: httpx.AsyncClient, url: str, body: Dict[str, Any], session_id: Optional[str]) -> httpx.Response:
+    """POST a JSON-RPC message to the Streamable HTTP endpoint"""
+    headers = {"Accept": MCP_ACCEPT}
+    if session_id:
+        headers["mcp-session-id"] = session_id
+    return await client.post(url, json=body, headers=headers)
+
+
+def mcp_messages(response: httpx.Response) -> List[Dict[str, Any]]:
+    """JSON-RPC messages of a Streamable HTTP response (JSON or SSE)"""
+    if response.headers.get("content-type", "").startswith("application/json"):
+        data = response.json()
+        return data if isinstance(data, list) else [data]
+    return parse_sse_messages(response.text)
+
+
+async def mcp_worker(client: httpx.AsyncClient, base_url: str, call: Dict[str, Any], deadline: float, result: LoadResult):
+    """Open a FastMCP session on /mcp and send tools/call requests until the deadline"""
+    url = f"{base_url}/mcp"
+    response = await mcp_post(client, url, {
+        "jsonrpc": "2.0",
+        "id": 0,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "benchmark", "version": "1.0"}
+        }
+    }, None)
+    response.raise_for_status()
+    session_id = response.headers.get("mcp-session-id")
+    await mcp_post(client, url, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session_id)
+    
+    request_id = 0
+    try:
+        while time.monotonic() < deadline:
+            request_id += 1
+            body = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": call}
+            started = time.perf_counter()
+            try:
+                response = await mcp_post(client, url, body, session_id)
+                response.raise_for_status()
+                messages = [message for message in mcp_messages(response) if message.get("id") == request_id]
+                if not messages:
+                    raise ValueError("No response message")
+                ok, success = tool_result_ok(messages[0])
+            except (httpx.HTTPError, ValueError):
+                result.errors += 1
+                continue
+            if not ok:
+                result.errors += 1
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.bytes += len(response.content)
+            if not success:
+                result.tool_failures += 1
+    finally:
+        if session_id:
+            try:
+                await client.delete(url, headers={"mcp-session-id": session_id})
+            except httpx.HTTPError:
+                pass
+
+
+async def run_load(
+    transport: str,
+    base_url: str,
+    call: Dict[str, Any],
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> Dict[str, Any]:
+    """Run concurrent workers against one transport and summarize"""
+    worker = sse_worker if transport == "sse" else mcp_worker
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        if warmup > 0:
+            await asyncio.gather(*(
+                worker(client, base_url, call, time.monotonic() + warmup, LoadResult())
+                for _ in range(concurrency)
+            ))
+        result = LoadResult()
+        started = time.monotonic()
+        await asyncio.gather(*(
+            worker(client, base_url, call, started + duration, result)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.monotonic() - started
+    return result.summary(elapsed)
+
+
+def start_processes(args, work_dir: Path) -> Tuple[subprocess.Popen, subprocess.Popen, str, str]:
+    """Start the WordPress stub and the MCP server"""
+    stub_port = args.stub_port or free_port()
+    server_port = args.server_port or free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    server_url = f"http://127.0.0.1:{server_port}"
+    
+    stub = subprocess.Popen([
+        sys.executable, str(REPO_DIR / "benchmark_wordpress_stub.py"),
+        "--port", str(stub_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--posts", str(args.posts),
+        "--content-bytes", str(args.content_bytes),
+        "--seed", "1"
+    ])
+    wait_for_http(f"{stub_url}/stub/stats", stub)
+    
+    sites = {
+        f"bench{index}": {
+            "name": f"Benchmark site {index}",
+            "url": f"{stub_url}/s{index}/",
+            "username": "bench",
+            "password": "bench bench bench",
+            "language": "en"
+        }
+        for index in range(1, args.sites + 1)
+    }
+    sites_file = work_dir / "sites.json"
+    sites_file.write_text(json.dumps(sites))
+    data_dir = work_dir / "data"
+    data_dir.mkdir(exist_ok=True)
+    
+    env = dict(os.environ)
+    env.update({
+        "WORDPRESS_SITES_FILE": str(sites_file),
+        "WORDPRESS_DEFAULT_SITE": "bench1",
+        "WP_MIRROR_ENABLED": "1" if args.mirror else "0",
+        "PYTHONPATH": str(REPO_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    })
+    if "WP_ENCRYPTION_KEY" not in env:
+        from cryptography.fernet import Fernet
+        env["WP_ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+    for item in args.server_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_BOOTSTRAP, str(data_dir), str(server_port)],
+        cwd=str(work_dir),
+        env=env
+    )
+    try:
+        wait_for_http(f"{server_url}/health", server)
+    except Exception:
+        stub.terminate()
+        raise
+    return stub, server, stub_url, server_url
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """Print changes against a baseline; False if a metric regressed beyond max_regression percent"""
+    ok = True
+    print(f"\nCompared with baseline from {baseline.get('created', '?')}:")
+    for transport, current in results["results"].items():
+        previous = baseline.get("results", {}).get(transport)
+        if not previous:
+            print(f"  {transport}: not in baseline")
+            continue
+        for metric, higher_is_better in (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False), ("error_rate", False)):
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = ((new - old) / old * 100) if old else (0.0 if new == old else float("inf"))
+            regressed = change < -max_regression if higher_is_better else change > max_regression
+            if metric == "error_rate":
+                regressed = new > old + 0.001
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {transport:4} {metric:10} {old:>10} -> {new:>10} ({change:+.1f}%){flag}")
+            ok = ok and not regressed
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server throughput benchmark against a local WordPress stub")
+    parser.add_argument("--transports", default="sse,mcp", help="Comma-separated: sse, mcp")
+    parser.add_argument("--tool", default="get_posts", help="Tool to call")
+    parser.add_argument("--arguments", default='{"per_page": 10, "source": "origin"}', help="Tool arguments (JSON)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of measured load per transport")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of unmeasured load before each run")
+    parser.add_argument("--sites", type=int, default=1, help="Number of stub sites")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra stub latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of stub requests failing with HTTP 500")
+    parser.add_argument("--posts", type=int, default=200, help="Posts per stub site")
+    parser.add_argument("--content-bytes", type=int, default=2000, help="Post content size")
+    parser.add_argument("--mirror", action="store_true", help="Keep the local post mirror enabled")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the server (e.g. WP_HTTP_PER_HOST_LIMIT=50)")
+    parser.add_argument("--stub-port", type=int, default=0)
+    parser.add_argument("--server-port", type=int, default=0)
+    parser.add_argument("--write-baseline", metavar="FILE", help="Write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="Compare results with a baseline JSON file")
+    parser.add_argument("--max-regression", type=float, default=10, help="Allowed regression in percent for --compare")
+    args = parser.parse_args()
+    
+    call = {"name": args.tool, "arguments": json.loads(args.arguments)}
+    transports = [transport.strip() for transport in args.transports.split(",") if transport.strip()]
+    
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as work_dir:
+        stub, server, stub_url, server_url = start_processes(args, Path(work_dir))
+        try:
+            results = {}
+            for transport in transports:
+                print(f"Running {transport}: {args.concurrency} clients x {args.duration}s, {call['name']} ...", flush=True)
+                summary = asyncio.run(run_load(transport, server_url, call, args.concurrency, args.duration, args.warmup))
+                summary.update(read_rss(server.pid))
+                results[transport] = summary
+            stub_stats = httpx.get(f"{stub_url}/stub/stats").json()
+        finally:
+            server.terminate()
+            stub.terminate()
+            server.wait(10)
+            stub.wait(10)
+    
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {key: value for key, value in vars(args).items() if key not in ("write_baseline", "compare")},
+        "upstream": stub_stats,
+        "results": results
+    }
+    
+    print(f"\n{'transport':9} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7} {'peak MB':>8}")
+    for transport, summary in results.items():
+        print(
+            f"{transport:9} {summary['requests']:>9} {summary['errors']:>7} {summary['rps']:>8} "
+            f"{summary['p50_ms']!s:>8} {summary['p95_ms']!s:>8} {summary['p99_ms']!s:>8} "
+            f"{summary['rss_mb']!s:>7} {summary['peak_rss_mb']!s:>8}"
+        )
+    print(f"Upstream (stub) requests: {stub_stats['requests']}, injected errors: {stub_stats['errors']}")
+    
+    if args.write_baseline:
+        Path(args.write_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.write_baseline).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Baseline written to {args.write_baseline}")
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Local stub of the WordPress REST API posts endpoints for benchmarks
+
+Serves /wp-json/wp/v2/posts (list, get, create, update, delete) from memory
+with configurable latency, error rate and post size. Every site prefix works
+(/s1/wp-json/..., /s2/wp-json/...), so one stub can stand in for many sites.
+
+Usage:
+    python benchmark_wordpress_stub.py --port 8900 --latency-ms 200 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+def make_post(post_id: int, content_bytes: int, site: str = "") -> Dict[str, Any]:
+    """Build a post object shaped like the WordPress REST API response"""
+    date = datetime(2024, 1, 1) + timedelta(hours=post_id)
+    paragraph = f"<p>Post {post_id} body text about yoga, astrology and automation.</p>\n"
+    content = (paragraph * (content_bytes // len(paragraph) + 1))[:content_bytes]
+    return {
+        "id": post_id,
+        "date": date.isoformat(),
+        "modified": date.isoformat(),
+        "slug": f"post-{post_id}",
+        "status": "publish",
+        "link": f"https://stub.local/{site}post-{post_id}/",
+        "title": {"rendered": f"Stub post {post_id}"},
+        "content": {"rendered": content, "protected": False},
+        "excerpt": {"rendered": f"<p>Excerpt of post {post_id}</p>\n", "protected": False},
+        "author": 1,
+        "featured_media": 0,
+        "categories": [1],
+        "tags": []
+    }
+
+
+def project(post: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+    """Apply the _fields query parameter"""
+    if not fields:
+        return post
+    wanted = {field.split(".")[0] for field in fields.split(",")}
+    return {key: value for key, value in post.items() if key in wanted}
+
+
+def create_stub_app(
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    error_rate: float = 0,
+    posts: int = 200,
+    content_bytes: int = 2000,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the stub WordPress app
+    
+    Args:
+        latency_ms: Added response time per request
+        jitter_ms: Random extra response time (uniform 0..jitter_ms)
+        error_rate: Share of requests answered with HTTP 500 (0-1)
+        posts: Number of posts per site
+        content_bytes: Size of each post's rendered content
+        seed: Random seed for latency jitter and errors
+    
+    Returns:
+        FastAPI app
+    """
+    app = FastAPI(title="WordPress REST API stub")
+    rng = random.Random(seed)
+    sites: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    stats = {"requests": 0, "errors": 0}
+    
+    def site_posts(site: str) -> Dict[int, Dict[str, Any]]:
+        if site not in sites:
+            sites[site] = {post_id: make_post(post_id, content_bytes, site) for post_id in range(posts, 0, -1)}
+        return sites[site]
+    
+    async def delay_or_fail() -> Optional[Response]:
+        stats["requests"] += 1
+        delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"code": "stub_error", "message": "Injected error"}, status_code=500)
+        return None
+    
+    @app.get("/stub/stats")
+    async def stub_stats():
+        return stats
+    
+    @app.get("/{site:path}wp-json/wp/v2/posts")
+    async def list_posts(site: str, request: Request):
+        error = await delay_or_fail()
+        if error:
+            return error
+        params = request.query_params
+        per_page = min(max(int(params.get("per_page", 10)), 1), 100)
+        page = max(int(params.get("page", 1)), 1)
+        items: List[Dict[str, Any]] = list(site_posts(site).values())
+        total = len(items)
+        total_pages = max((total + per_page - 1) // per_page, 1)
+        if page > total_pages and total:
+            return JSONResponse({"code": "rest_post_invalid_page_number"}, status_code=400)
+        body = json.dumps([
+            project(post, params.get("_fields"))
+            for post in items[(page - 1) * per_page:page * per_page]
+        ]).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        headers = {"X-WP-Total": str(total), "X-WP-TotalPages": str(total_pages), "ETag": etag}
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+    
+    @app.get("/{site:path}wp-json/wp/v2/posts/{post_id}")
+    async def get_post(site: str, post_id: int, request: Request):
+        error = await delay_or_fail()
+        if error:
+            return error
+        post = site_posts(site).get(post_id)
+        if post is None:
+            return JSONResponse({"code": "rest_post_invalid_id"}, status_code=404)
+        return project(post, request.query_params.get("_fields"))
+    
+    @app.post("/{site:path}wp-json/wp/v2/posts")
+    async def create_post(site: str, request: Request):
+        error = await delay_or_fail()
+        if error:
+            return error
+        data = await request.json()
+        items = site_posts(site)
+        post_id = max(items, default=0) + 1
+        post = make_post(post_id, 0, site)
+        post["title"]["rendered"] = data.get("title", "")
+        post["content"]["rendered"] = data.get("content", "")
+        post["excerpt"]["rendered"] = data.get("excerpt", "")
+        post["status"] = data.get("status", "publish")
+        items[post_id] = post
+        return JSONResponse(post, status_code=201)
+    
+    @app.post("/{site:path}wp-json/wp/v2/posts/{post_id}")
+    async def update_post(site: str, post_id: int, request: Request):
+        error = await delay_or_fail()
+        if error:
+            return error
+        post = site_posts(site).get(post_id)
+        if post is None:
+            return JSONResponse({"code": "rest_post_invalid_id"}, status_code=404)
+        data = await request.json()
+        for field in ("title", "content", "excerpt"):
+            if field in data:
+                post[field]["rendered"] = data[field]
+        post["modified"] = datetime.now().isoformat()
+        return post
+    
+    @app.delete("/{site:path}wp-json/wp/v2/posts/{post_id}")
+    async def delete_post(site: str, post_id: int):
+        error = await delay_or_fail()
+        if error:
+            return error
+        post = site_posts(site).pop(post_id, None)
+        if post is None:
+            return JSONResponse({"code": "rest_post_invalid_id"}, status_code=404)
+        return {"deleted": True, "previous": post}
+    
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WordPress REST API stub for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra latency (0..N ms)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests failing with HTTP 500")
+    parser.add_argument("--posts", type=int, default=200, help="Posts per site")
+    parser.add_argument("--content-bytes", type=int, default=2000, help="Rendered content size per post")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    
+    app = create_stub_app(args.latency_ms, args.jitter_ms, args.error_rate, args.posts, args.content_bytes, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
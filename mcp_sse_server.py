@@ -5,27 +5,71 @@ Works on mcp.2msp.online with SSL certificate
 """
 
 import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import http.cookiejar
+import importlib.util
+import inspect
 import json
 import logging
-from typing import Optional, Dict, Any
+import os
+import random
+import re
+import secrets
+import socket
+import sys
+import time
+from collections import OrderedDict, deque
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Callable, Awaitable
 
 import httpx
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.transport_security import TransportSecuritySettings
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, Response
 from sse_starlette import EventSourceResponse, ServerSentEvent
 
 # Import user WordPress connections
 try:
-    from persistent_wordpress_connections import get_all_enabled_connections, update_last_used
+    from persistent_wordpress_connections import (
+        get_all_enabled_connections,
+        update_last_used_many,
+        decrypt_password,
+        get_connections_version
+    )
     USER_CONNECTIONS_AVAILABLE = True
 except ImportError:
     logger.warning("persistent_wordpress_connections not available, using default sites only")
     USER_CONNECTIONS_AVAILABLE = False
     get_all_enabled_connections = None
-    update_last_used = None
+    update_last_used_many = None
+    decrypt_password = None
+    get_connections_version = None
+
+# Local post mirror
+import wordpress_post_mirror as post_mirror
+
+# Prometheus-style metrics
+import server_metrics as metrics
+
+# Runtime profiling
+import server_profiling as profiling
+
+# State shared by worker processes (multi-worker mode)
+import shared_state
+
+# Optional fast JSON encoder for /sse responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +78,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# When started as a script, uvicorn workers (and their spawned processes,
+# which re-run the script) import "mcp_sse_server:app"; reuse this module
+# instead of executing it a second time
+if __name__ in ("__main__", "__mp_main__"):
+    sys.modules.setdefault("mcp_sse_server", sys.modules[__name__])
+
 # ========================================
 # CONFIGURATION - MULTIPLE WORDPRESS SITES
 # ========================================
@@ -75,14 +125,651 @@ WORDPRESS_SITES = {
     }
 }
 
+# Replace the built-in sites with a JSON file of the same shape, e.g. to run
+# against a local WordPress stub (see benchmark_server.py)
+WORDPRESS_SITES_FILE = os.environ.get("WORDPRESS_SITES_FILE")
+if WORDPRESS_SITES_FILE:
+    with open(WORDPRESS_SITES_FILE, encoding="utf-8") as sites_file:
+        WORDPRESS_SITES = json.load(sites_file)
+
 # Default site (for backward compatibility)
-DEFAULT_SITE = "thamini"
+DEFAULT_SITE = os.environ.get("WORDPRESS_DEFAULT_SITE", "thamini")
+if DEFAULT_SITE not in WORDPRESS_SITES:
+    DEFAULT_SITE = next(iter(WORDPRESS_SITES))
 WORDPRESS_URL = WORDPRESS_SITES[DEFAULT_SITE]["url"]
 WORDPRESS_USERNAME = WORDPRESS_SITES[DEFAULT_SITE]["username"]
 WORDPRESS_PASSWORD = WORDPRESS_SITES[DEFAULT_SITE]["password"]
 
+# Seconds between checks of the user connections store for changes, i.e. how
+# long a new or removed connection may go unnoticed by a worker
+MCP_SITE_REGISTRY_TTL = float(os.environ.get("MCP_SITE_REGISTRY_TTL", "1.0"))
+
+# WordPress client pool limits
+WP_CLIENT_POOL_SIZE = int(os.environ.get("WP_CLIENT_POOL_SIZE", "64"))
+WP_CLIENT_IDLE_TTL = float(os.environ.get("WP_CLIENT_IDLE_TTL", "600"))
+
+# How often buffered last_used timestamps are written to the connections store (seconds)
+LAST_USED_FLUSH_INTERVAL = float(os.environ.get("WP_LAST_USED_FLUSH_INTERVAL", "60"))
+
+# Default and maximum number of posts created at the same time on one site by bulk tools
+BULK_CONCURRENCY_PER_SITE = int(os.environ.get("WP_BULK_CONCURRENCY_PER_SITE", "4"))
+BULK_MAX_CONCURRENCY_PER_SITE = int(os.environ.get("WP_BULK_MAX_CONCURRENCY_PER_SITE", "16"))
+
+# Local post mirror: sync interval, full (deletion-detecting) sync interval and
+# number of sites synced at the same time (seconds / count)
+WP_MIRROR_ENABLED = os.environ.get("WP_MIRROR_ENABLED", "1").lower() in ("1", "true", "yes")
+WP_MIRROR_SYNC_INTERVAL = float(os.environ.get("WP_MIRROR_SYNC_INTERVAL", "300"))
+WP_MIRROR_FULL_SYNC_INTERVAL = float(os.environ.get("WP_MIRROR_FULL_SYNC_INTERVAL", "86400"))
+WP_MIRROR_SYNC_CONCURRENCY = int(os.environ.get("WP_MIRROR_SYNC_CONCURRENCY", "4"))
+
+# Shared HTTP transport for all WordPress sites
+WP_HTTP_TIMEOUT = float(os.environ.get("WP_HTTP_TIMEOUT", "30"))
+WP_HTTP_MAX_CONNECTIONS = int(os.environ.get("WP_HTTP_MAX_CONNECTIONS", "100"))
+WP_HTTP_MAX_KEEPALIVE = int(os.environ.get("WP_HTTP_MAX_KEEPALIVE", "20"))
+WP_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("WP_HTTP_KEEPALIVE_EXPIRY", "30"))
+WP_HTTP_PER_HOST_LIMIT = int(os.environ.get("WP_HTTP_PER_HOST_LIMIT", "10"))
+WP_HTTP2 = os.environ.get("WP_HTTP2", "").lower() in ("1", "true", "yes")
+
+# Per-site circuit breaker: consecutive failures (connection errors, timeouts,
+# 5xx responses) that open it, and seconds it stays open before a probe request
+WP_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("WP_CIRCUIT_FAILURE_THRESHOLD", "5"))
+WP_CIRCUIT_RESET_TIMEOUT = float(os.environ.get("WP_CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Retries of GET requests after connection errors, timeouts and 502/503/504,
+# with exponential backoff (base and cap in seconds) and full jitter
+WP_HTTP_GET_RETRIES = int(os.environ.get("WP_HTTP_GET_RETRIES", "2"))
+WP_HTTP_RETRY_BACKOFF = float(os.environ.get("WP_HTTP_RETRY_BACKOFF", "0.25"))
+WP_HTTP_RETRY_BACKOFF_MAX = float(os.environ.get("WP_HTTP_RETRY_BACKOFF_MAX", "4"))
+
+# Adaptive timeouts: the read timeout of a site's GETs is WP_HTTP_TIMEOUT_MULTIPLIER
+# times its recent p99 GET response time, kept between WP_HTTP_TIMEOUT_MIN and
+# WP_HTTP_TIMEOUT. WP_HTTP_TIMEOUT is used until WP_LATENCY_MIN_SAMPLES responses
+# have been seen, and always for writes. Connecting and sending the request body
+# have their own fixed budgets.
+WP_HTTP_TIMEOUT_MIN = float(os.environ.get("WP_HTTP_TIMEOUT_MIN", "2"))
+WP_HTTP_TIMEOUT_MULTIPLIER = float(os.environ.get("WP_HTTP_TIMEOUT_MULTIPLIER", "3"))
+WP_HTTP_CONNECT_TIMEOUT = float(os.environ.get("WP_HTTP_CONNECT_TIMEOUT", "5"))
+WP_HTTP_WRITE_TIMEOUT = float(os.environ.get("WP_HTTP_WRITE_TIMEOUT", "10"))
+WP_LATENCY_SAMPLES = int(os.environ.get("WP_LATENCY_SAMPLES", "200"))
+WP_LATENCY_MIN_SAMPLES = int(os.environ.get("WP_LATENCY_MIN_SAMPLES", "20"))
+
+# Hedged reads: a GET not answered within the site's p95 response time (at
+# least WP_HEDGE_MIN_DELAY seconds) is sent a second time, the first answer wins
+WP_HEDGE_READS = os.environ.get("WP_HEDGE_READS", "").lower() in ("1", "true", "yes")
+WP_HEDGE_MIN_DELAY = float(os.environ.get("WP_HEDGE_MIN_DELAY", "0.05"))
+
+# get_posts read cache: entries are fresh for WP_POSTS_CACHE_TTL seconds and
+# served stale (while revalidating in the background) up to WP_POSTS_CACHE_STALE_TTL
+WP_POSTS_CACHE_TTL = float(os.environ.get("WP_POSTS_CACHE_TTL", "30"))
+WP_POSTS_CACHE_STALE_TTL = float(os.environ.get("WP_POSTS_CACHE_STALE_TTL", "300"))
+WP_POSTS_CACHE_MAX_ENTRIES = int(os.environ.get("WP_POSTS_CACHE_MAX_ENTRIES", "256"))
+
+# SSE sessions: maximum number of open sessions, idle timeout (seconds without
+# client messages), heartbeat interval and per-session outgoing event queue size
+MCP_SSE_MAX_SESSIONS = int(os.environ.get("MCP_SSE_MAX_SESSIONS", "1000"))
+MCP_SSE_SESSION_IDLE_TIMEOUT = float(os.environ.get("MCP_SSE_SESSION_IDLE_TIMEOUT", "3600"))
+MCP_SSE_HEARTBEAT_INTERVAL = float(os.environ.get("MCP_SSE_HEARTBEAT_INTERVAL", "30"))
+MCP_SSE_SESSION_QUEUE_SIZE = int(os.environ.get("MCP_SSE_SESSION_QUEUE_SIZE", "64"))
+# Ping interval of sse_starlette for session streams (they get heartbeats from the
+# session manager; 0 is not used because older sse_starlette versions spin on it)
+SSE_LIBRARY_PING_INTERVAL = 24 * 3600
+
+# Token for /admin endpoints (profiler, allocation snapshots, request timings) and
+# /metrics; these endpoints are disabled when empty
+MCP_ADMIN_TOKEN = os.environ.get("MCP_ADMIN_TOKEN", "")
+
+# Host and Origin headers accepted on /mcp (FastMCP DNS rebinding protection),
+# comma separated; an entry ending in ":*" allows any port
+MCP_ALLOWED_HOSTS = os.environ.get(
+    "MCP_ALLOWED_HOSTS",
+    "mcp.2msp.online,2msp.online,www.2msp.online,localhost,localhost:*,127.0.0.1,127.0.0.1:*"
+)
+MCP_ALLOWED_ORIGINS = os.environ.get(
+    "MCP_ALLOWED_ORIGINS",
+    "https://mcp.2msp.online,https://2msp.online,https://www.2msp.online,http://localhost:*,http://127.0.0.1:*"
+)
+
+# Header with the username of the caller, set by the authenticating proxy in front
+# of the server. Site selectors and searches over all sites only cover the
+# built-in sites and the caller's own WordPress connections (none without header).
+# The header is trusted only on connections from MCP_TRUSTED_PROXIES, and the proxy
+# must overwrite (or clear) whatever the client sent: the shipped nginx configs
+# clear it, set it from the proxy's own authentication (e.g. $remote_user) instead
+MCP_USER_HEADER = os.environ.get("MCP_USER_HEADER", "X-MCP-User")
+MCP_TRUSTED_PROXIES = frozenset(
+    address.strip()
+    for address in os.environ.get("MCP_TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if address.strip()
+)
+# Let search_posts return drafts and private posts of the caller's own connections.
+# Enable only behind a proxy that authenticates users and sets MCP_USER_HEADER
+MCP_SEARCH_OWN_DRAFTS = os.environ.get("MCP_SEARCH_OWN_DRAFTS", "0").lower() in ("1", "true", "yes")
+
+# Requests to /sse and /mcp carrying this header (value = MCP_ADMIN_TOKEN) are timed
+MCP_TIMING_HEADER = "X-MCP-Timing"
+MCP_TIMING_MAX_ENTRIES = int(os.environ.get("MCP_TIMING_MAX_ENTRIES", "500"))
+
+# Number of uvicorn worker processes. With more than one worker (or
+# MCP_SHARED_STATE=1 when a process manager starts the workers) read cache
+# invalidation, mirror syncs and SSE session messages are coordinated
+# through shared_state; /mcp runs stateless so any worker can answer it
+MCP_WORKERS = max(int(os.environ.get("MCP_WORKERS", "1")), 1)
+MCP_SHARED_STATE = os.environ.get("MCP_SHARED_STATE", "1" if MCP_WORKERS > 1 else "0").lower() in ("1", "true", "yes")
+# Seconds between checks for SSE session messages received by other workers
+MCP_RELAY_POLL_INTERVAL = float(os.environ.get("MCP_RELAY_POLL_INTERVAL", "0.05"))
+# Seconds between re-reads of the shared read cache generation of a site, i.e.
+# how long a worker may serve cached reads after another worker wrote to the site
+MCP_SHARED_GENERATION_TTL = float(os.environ.get("MCP_SHARED_GENERATION_TTL", "1.0"))
+
+
+# ========================================
+# METRICS
+# ========================================
+
+TOOL_CALLS = metrics.REGISTRY.counter(
+    "mcp_tool_calls_total", "MCP tool calls by tool, site and outcome", ("tool", "site", "outcome")
+)
+TOOL_DURATION = metrics.REGISTRY.histogram(
+    "mcp_tool_duration_seconds", "MCP tool call duration", ("tool", "site")
+)
+UPSTREAM_REQUESTS = metrics.REGISTRY.counter(
+    "wp_upstream_requests_total", "WordPress REST API requests by host, method and status", ("host", "method", "status")
+)
+UPSTREAM_DURATION = metrics.REGISTRY.histogram(
+    "wp_upstream_duration_seconds", "WordPress REST API response time", ("host", "method")
+)
+UPSTREAM_RETRIES = metrics.REGISTRY.counter(
+    "wp_upstream_retries_total", "Retried WordPress REST API GET requests", ("host",)
+)
+HEDGED_REQUESTS = metrics.REGISTRY.counter(
+    "wp_hedged_requests_total", "Hedged WordPress REST API GETs by the request that answered first", ("host", "winner")
+)
+COALESCED_REQUESTS = metrics.REGISTRY.counter(
+    "wp_coalesced_requests_total", "WordPress REST API GETs answered by an identical in-flight request", ("host",)
+)
+CIRCUIT_REJECTIONS = metrics.REGISTRY.counter(
+    "wp_circuit_rejections_total", "Requests refused by an open circuit breaker", ("host",)
+)
+STORE_LOAD_DURATION = metrics.REGISTRY.histogram(
+    "connection_store_load_seconds", "Time to load user connections into the site registry"
+)
+STORE_SAVE_DURATION = metrics.REGISTRY.histogram(
+    "connection_store_save_seconds", "Time to write buffered last_used timestamps"
+)
+
+
+def instrument_tool(tool):
+    """Decorator recording call counts and duration of an MCP tool per site"""
+    takes_site = "site" in inspect.signature(tool).parameters
+    
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        site = ""
+        if takes_site:
+            # Unknown site IDs fall back to the default site, keep labels bounded too
+            site = kwargs.get("site") or DEFAULT_SITE
+            if site_registry.get(site) is None:
+                site = "unknown"
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await tool(*args, **kwargs)
+            outcome = "success" if isinstance(result, dict) and result.get("success") else "failure"
+            return result
+        finally:
+            TOOL_CALLS.inc(tool=tool.__name__, site=site, outcome=outcome)
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=tool.__name__, site=site)
+    
+    return wrapper
+
+
+def worker_id() -> str:
+    """ID of this process in shared_state (read per call, forked workers differ)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SiteRegistry:
+    """
+    Process-wide index of available WordPress sites (default + user connections)
+    
+    The index is built once and rebuilt only when the connections store
+    reports a new version (the version lives in the store, so all workers
+    see it). On the event loop the version is checked at most every ttl
+    seconds, in a thread, and lookups read the index as it is meanwhile.
+    User connection passwords stay encrypted in the index and are decrypted
+    on first use of that particular site.
+    """
+    
+    _UNLOADED = object()
+    
+    def __init__(self, default_sites: Dict[str, Dict], ttl: float = 1.0):
+        """
+        Initialize site registry
+        
+        Args:
+            default_sites: Built-in sites (WORDPRESS_SITES)
+            ttl: Seconds between checks of the connections store version
+        """
+        self._default_sites = default_sites
+        self.ttl = ttl
+        self._sites: Dict[str, Dict] = {}
+        self._by_owner: Dict[str, List[str]] = {}
+        self._passwords: Dict[str, str] = {}
+        self._version: Any = self._UNLOADED
+        self._next_check = 0.0
+        self._checking = False
+        self._tasks: set = set()
+    
+    def _current_version(self) -> Any:
+        """Get version marker of the user connections store"""
+        if not (USER_CONNECTIONS_AVAILABLE and get_connections_version):
+            return None
+        try:
+            return get_connections_version()
+        except Exception as e:
+            logger.error(f"Failed to check user connections version: {e}")
+            return self._version
+    
+    def _load(self, version: Any) -> Optional[Tuple[Any, Dict[str, Dict], Dict[str, List[str]]]]:
+        """
+        Build a new index if the connections store has changed since version
+        
+        Only reads the store, so it can run in a thread.
+        
+        Returns:
+            Tuple of (version, sites, by_owner), or None if nothing changed
+        """
+        current = self._current_version()
+        if current == version:
+            return None
+        sites, by_owner = self._build()
+        return current, sites, by_owner
+    
+    def _build(self) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+        """Build the index from default sites and stored user connections"""
+        sites = {site_id: dict(site_data) for site_id, site_data in self._default_sites.items()}
+        by_owner: Dict[str, List[str]] = {}
+        
+        if USER_CONNECTIONS_AVAILABLE and get_all_enabled_connections:
+            try:
+                with STORE_LOAD_DURATION.time():
+                    user_connections = get_all_enabled_connections(decrypt=False)
+                for conn_id, conn_data in user_connections.items():
+                    owner = conn_data.get("owner", "unknown")
+                    sites[conn_id] = {
+                        "name": conn_data.get("site_name", "User Site"),
+                        "url": conn_data.get("site_url"),
+                        "username": conn_data.get("wp_username"),
+                        "encrypted_password": conn_data.get("wp_password"),
+                        "language": conn_data.get("site_language", "en"),
+                        "owner": owner,
+                        "user_connection": True
+                    }
+                    by_owner.setdefault(owner, []).append(conn_id)
+                logger.info(f"Loaded {len(user_connections)} user WordPress connections")
+            except Exception as e:
+                logger.error(f"Failed to load user connections: {e}")
+        
+        return sites, by_owner
+    
+    def _apply(self, loaded: Optional[Tuple[Any, Dict[str, Dict], Dict[str, List[str]]]]):
+        """Swap in an index built by _load()"""
+        if loaded is None:
+            return
+        self._version, self._sites, self._by_owner = loaded
+        self._passwords = {}
+    
+    async def _load_in_thread(self):
+        """Check the store and rebuild the index without blocking the event loop"""
+        try:
+            self._apply(await asyncio.to_thread(self._load, self._version))
+        except Exception as e:
+            logger.error(f"Failed to refresh site registry: {e}")
+        finally:
+            self._checking = False
+    
+    def refresh(self):
+        """
+        Rebuild the index if the connections store has changed
+        
+        Outside an event loop (startup, scripts) the check runs inline. On the
+        event loop it runs in a thread once ttl has passed since the last one,
+        and the current index keeps serving lookups until it finishes.
+        """
+        if self._checking or time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self.ttl
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._apply(self._load(self._version))
+            return
+        self._checking = True
+        task = loop.create_task(self._load_in_thread())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def get(self, site_id: str) -> Optional[Dict]:
+        """
+        Get site config by ID (without password)
+        
+        Args:
+            site_id: Site ID from WORDPRESS_SITES or user connections
+        
+        Returns:
+            Site config dict, or None if the site is unknown
+        """
+        self.refresh()
+        return self._sites.get(site_id)
+    
+    def get_password(self, site_id: str) -> Optional[str]:
+        """
+        Get plain text password for a site, decrypting it on first use
+        
+        Args:
+            site_id: Site ID
+        
+        Returns:
+            Password, or None if the site is unknown
+        """
+        site_config = self.get(site_id)
+        if site_config is None:
+            return None
+        if not site_config.get("user_connection"):
+            return site_config["password"]
+        if site_id not in self._passwords:
+            self._passwords[site_id] = decrypt_password(site_config["encrypted_password"])
+        return self._passwords[site_id]
+    
+    def all(self) -> Dict[str, Dict]:
+        """Get all sites keyed by site ID (without passwords)"""
+        self.refresh()
+        return dict(self._sites)
+    
+    def by_owner(self, owner: str) -> Dict[str, Dict]:
+        """
+        Get user connection sites owned by a user
+        
+        Args:
+            owner: Username of the connection owner
+        
+        Returns:
+            Dictionary mapping site_id to site config
+        """
+        self.refresh()
+        return {site_id: self._sites[site_id] for site_id in self._by_owner.get(owner, [])}
+    
+    def visible(self, owner: Optional[str]) -> Dict[str, Dict]:
+        """
+        Get sites a user may pick: built-in sites and the user's own connections
+        
+        Args:
+            owner: Username of the caller (None = built-in sites only)
+        
+        Returns:
+            Dictionary mapping site_id to site config
+        """
+        self.refresh()
+        site_ids = list(self._default_sites) + (self._by_owner.get(owner, []) if owner else [])
+        return {site_id: self._sites[site_id] for site_id in site_ids}
+    
+    def select(self, language: Optional[str] = None, owner: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Select sites by field values
+        
+        Without owner only the built-in sites are selected, user connections
+        are only selected by their owner.
+        
+        Args:
+            language: Site language code (uk, ru, en, ...)
+            owner: Username of the connection owner (user connections only)
+        
+        Returns:
+            Dictionary mapping site_id to site config
+        """
+        self.refresh()
+        site_ids = self._by_owner.get(owner, []) if owner is not None else self._default_sites
+        return {
+            site_id: self._sites[site_id]
+            for site_id in site_ids
+            if language is None or self._sites[site_id].get("language") == language
+        }
+    
+    def site_name(self, site_id: str) -> str:
+        """Get display name of a site (falls back to the site ID)"""
+        site_config = self.get(site_id)
+        return site_config.get("name", site_id) if site_config else site_id
+
+
+site_registry = SiteRegistry(WORDPRESS_SITES, MCP_SITE_REGISTRY_TTL)
+# Load the index before serving, later checks run in the background
+site_registry.refresh()
+
+# Username the request being handled on /sse acts for (see MCP_USER_HEADER)
+_caller: ContextVar[Optional[str]] = ContextVar("caller", default=None)
+
+
+def request_caller(request: Request) -> Optional[str]:
+    """
+    Get the username a request acts for from MCP_USER_HEADER
+    
+    Args:
+        request: Incoming HTTP request
+    
+    Returns:
+        Username, or None if the header is missing or the request did not
+        come through a trusted proxy
+    """
+    if request.client is None or request.client.host not in MCP_TRUSTED_PROXIES:
+        return None
+    return request.headers.get(MCP_USER_HEADER) or None
+
+
+def current_caller(ctx: Optional[Context] = None) -> Optional[str]:
+    """
+    Get the username the running tool call acts for
+    
+    On /mcp it comes from the request headers of the FastMCP context, on /sse
+    from the request that opened the session (or carried the message).
+    
+    Args:
+        ctx: FastMCP request context (None when called from /sse)
+    
+    Returns:
+        Username, or None if the request names no user
+    """
+    if isinstance(ctx, Context):
+        try:
+            request = ctx.request_context.request
+        except ValueError:
+            return None
+        if request is None:
+            return None
+        return request_caller(request)
+    return _caller.get()
+
+
+class LastUsedBuffer:
+    """
+    Write-behind buffer for user connection last_used timestamps
+    
+    Timestamps are recorded in memory (latest wins per connection) and
+    written to the connections store in one batch on an interval and at shutdown.
+    """
+    
+    def __init__(self, flush_interval: float):
+        """
+        Initialize last_used buffer
+        
+        Args:
+            flush_interval: Seconds between background flushes
+        """
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def record(self, owner: str, connection_id: str):
+        """Record usage of a user connection (no I/O)"""
+        self._pending[(owner, connection_id)] = datetime.now().isoformat()
+    
+    async def flush(self):
+        """Write all pending timestamps to the connections store"""
+        if not self._pending or not (USER_CONNECTIONS_AVAILABLE and update_last_used_many):
+            return
+        
+        pending, self._pending = self._pending, {}
+        try:
+            with STORE_SAVE_DURATION.time():
+                saved = await asyncio.to_thread(update_last_used_many, pending)
+        except Exception as e:
+            logger.error(f"Failed to flush last_used timestamps: {e}")
+            saved = False
+        
+        if not saved:
+            # Keep entries for the next flush unless they were recorded again meanwhile
+            for key, timestamp in pending.items():
+                self._pending.setdefault(key, timestamp)
+    
+    async def _run(self):
+        """Flush pending timestamps periodically"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    def start(self):
+        """Start background flushing"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop background flushing and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+last_used_buffer = LastUsedBuffer(LAST_USED_FLUSH_INTERVAL)
+
+
+class _PooledClient:
+    """Client pool entry"""
+    
+    __slots__ = ("fingerprint", "client", "last_used")
+    
+    def __init__(self, fingerprint: str, client: "WordPressMCP", last_used: float):
+        self.fingerprint = fingerprint
+        self.client = client
+        self.last_used = last_used
+
+
+class WordPressClientPool:
+    """
+    Bounded pool of WordPressMCP clients keyed by site ID
+    
+    Entries are kept in LRU order and evicted when the pool is full or
+    idle for too long. Each entry remembers a fingerprint of the site URL
+    and credentials, so a changed connection gets a fresh client on the
+    next request. Evicted clients are released once their in-flight requests finish.
+    """
+    
+    def __init__(self, max_size: int, idle_ttl: float):
+        """
+        Initialize client pool
+        
+        Args:
+            max_size: Maximum number of cached clients
+            idle_ttl: Seconds after which an unused client is evicted
+        """
+        self.max_size = max(max_size, 1)
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._closing: set = set()
+    
+    @staticmethod
+    def fingerprint(url: str, username: str, password: str) -> str:
+        """Fingerprint of site URL and credentials"""
+        return hashlib.sha256(f"{url}\0{username}\0{password}".encode()).hexdigest()
+    
+    def get(self, site_id: str, url: str, username: str, password: str) -> "WordPressMCP":
+        """
+        Get pooled client for a site, creating it if needed
+        
+        Args:
+            site_id: Site ID
+            url: WordPress site URL
+            username: WordPress username
+            password: WordPress application password
+        
+        Returns:
+            WordPressMCP client instance
+        """
+        now = time.monotonic()
+        self.evict_idle(now)
+        
+        fingerprint = self.fingerprint(url, username, password)
+        entry = self._entries.get(site_id)
+        if entry is not None:
+            if entry.fingerprint == fingerprint:
+                entry.last_used = now
+                self._entries.move_to_end(site_id)
+                return entry.client
+            logger.info(f"Connection settings changed for site '{site_id}', replacing client")
+            self._evict(site_id)
+        
+        client = WordPressMCP(url=url, username=username, password=password)
+        self._entries[site_id] = _PooledClient(fingerprint, client, now)
+        
+        while len(self._entries) > self.max_size:
+            self._evict(next(iter(self._entries)))
+        
+        return client
+    
+    def evict_idle(self, now: Optional[float] = None):
+        """Evict clients that have not been used for idle_ttl seconds"""
+        now = time.monotonic() if now is None else now
+        while self._entries:
+            site_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_ttl:
+                break
+            self._evict(site_id)
+    
+    def _evict(self, site_id: str):
+        """Remove client from the pool and close it in the background"""
+        entry = self._entries.pop(site_id)
+        try:
+            task = asyncio.get_running_loop().create_task(entry.client.close_when_idle())
+        except RuntimeError:
+            # No running event loop, nothing can be using the client
+            asyncio.run(entry.client.close())
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+    
+    async def close_all(self):
+        """Close all pooled clients"""
+        while self._entries:
+            self._evict(next(iter(self._entries)))
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+    
+    def clients(self) -> List["WordPressMCP"]:
+        """Get pooled clients"""
+        return [entry.client for entry in self._entries.values()]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, site_id: str) -> bool:
+        return site_id in self._entries
+
+
 # Global WordPress client instances
-wp_clients: Dict[str, Any] = {}
+wp_clients = WordPressClientPool(WP_CLIENT_POOL_SIZE, WP_CLIENT_IDLE_TTL)
 
 
 def load_all_sites() -> Dict[str, Dict]:
@@ -90,73 +777,55 @@ def load_all_sites() -> Dict[str, Dict]:
     Load all available WordPress sites (default + user connections)
     
     Returns:
-        Dictionary of all available sites
+        Dictionary of all available sites (user connection passwords are not included)
     """
-    all_sites = WORDPRESS_SITES.copy()
+    return site_registry.all()
+
+
+def resolve_site_id(site_id: Optional[str] = None) -> str:
+    """
+    Resolve requested site ID the way get_wordpress_client() does
     
-    # Add user connections if available
-    if USER_CONNECTIONS_AVAILABLE and get_all_enabled_connections:
-        try:
-            user_connections = get_all_enabled_connections()
-            for conn_id, conn_data in user_connections.items():
-                all_sites[conn_id] = {
-                    "name": conn_data.get("site_name", "User Site"),
-                    "url": conn_data.get("site_url"),
-                    "username": conn_data.get("wp_username"),
-                    "password": conn_data.get("wp_password"),
-                    "language": conn_data.get("site_language", "en"),
-                    "owner": conn_data.get("owner", "unknown"),
-                    "user_connection": True
-                }
-            logger.info(f"Loaded {len(user_connections)} user WordPress connections")
-        except Exception as e:
-            logger.error(f"Failed to load user connections: {e}")
+    Args:
+        site_id: Site ID (optional)
     
-    return all_sites
+    Returns:
+        site_id if it is known, otherwise DEFAULT_SITE
+    """
+    if site_id is None:
+        return DEFAULT_SITE
+    if site_registry.get(site_id) is None:
+        logger.warning(f"Site '{site_id}' not found, using default site '{DEFAULT_SITE}'")
+        return DEFAULT_SITE
+    return site_id
 
 
-def get_wordpress_client(site_id: Optional[str] = None) -> "WordPressMCP":
+def get_wordpress_client(site_id: Optional[str] = None, record_usage: bool = True) -> "WordPressMCP":
     """
     Get WordPress client for specified site or default site
     
     Args:
         site_id: Site ID from WORDPRESS_SITES or user connections (optional, uses DEFAULT_SITE if not provided)
+        record_usage: Update last_used of user connections (off for background jobs)
     
     Returns:
         WordPressMCP client instance
     """
-    if site_id is None:
-        site_id = DEFAULT_SITE
+    # Look up site in the registry (including user connections)
+    site_id = resolve_site_id(site_id)
+    site_config = site_registry.get(site_id)
     
-    # Load all available sites (including user connections)
-    all_sites = load_all_sites()
-    
-    if site_id not in all_sites:
-        logger.warning(f"Site '{site_id}' not found, using default site '{DEFAULT_SITE}'")
-        site_id = DEFAULT_SITE
-    
-    # Use cached client if available
-    if site_id in wp_clients:
-        return wp_clients[site_id]
+    # Record usage for user connections (written to the store in batches)
+    if record_usage and site_config.get("user_connection"):
+        last_used_buffer.record(site_config.get("owner", "unknown"), site_id)
     
-    # Create new client
-    site_config = all_sites[site_id]
-    client = WordPressMCP(
+    # Pooled client (recreated if the site URL or credentials changed)
+    return wp_clients.get(
+        site_id,
         url=site_config["url"],
         username=site_config["username"],
-        password=site_config["password"]
+        password=site_registry.get_password(site_id)
     )
-    wp_clients[site_id] = client
-    
-    # Update last_used timestamp for user connections
-    if site_config.get("user_connection") and USER_CONNECTIONS_AVAILABLE and update_last_used:
-        try:
-            owner = site_config.get("owner", "unknown")
-            update_last_used(owner, site_id)
-        except Exception as e:
-            logger.error(f"Failed to update last_used for {site_id}: {e}")
-    
-    return client
 
 
 def list_available_sites() -> Dict[str, str]:
@@ -170,6 +839,519 @@ def list_available_sites() -> Dict[str, str]:
     return {site_id: site_data.get("name", site_id) for site_id, site_data in all_sites.items()}
 
 
+# ========================================
+# SHARED HTTP TRANSPORT
+# ========================================
+_shared_http_client: Optional[httpx.AsyncClient] = None
+_ssl_context = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    Get the HTTP client shared by all WordPressMCP instances
+    
+    One connection pool and one SSL context serve every site, so sites on the
+    same host reuse keep-alive connections and TLS sessions. Cookies are never
+    stored: the client serves sites of all users, a cookie set by one site
+    must not be sent with requests made for another user.
+    
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _shared_http_client, _ssl_context
+    
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        if _ssl_context is None:
+            _ssl_context = httpx.create_ssl_context()
+        
+        http2 = WP_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("WP_HTTP2 is set but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+        
+        _shared_http_client = httpx.AsyncClient(
+            timeout=WP_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=WP_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=WP_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=WP_HTTP_KEEPALIVE_EXPIRY
+            ),
+            http2=http2,
+            verify=_ssl_context,
+            headers={'Content-Type': 'application/json'},
+            # Empty allowed_domains: the jar accepts and returns no cookies
+            cookies=http.cookiejar.CookieJar(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        )
+        logger.info(
+            f"Shared HTTP transport initialized (max_connections={WP_HTTP_MAX_CONNECTIONS}, "
+            f"per_host={WP_HTTP_PER_HOST_LIMIT}, http2={http2})"
+        )
+    
+    return _shared_http_client
+
+
+def _host_semaphore(host: str) -> asyncio.Semaphore:
+    """Get semaphore limiting concurrent requests to one host"""
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(WP_HTTP_PER_HOST_LIMIT, 1))
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+async def close_shared_http_client():
+    """Close the shared HTTP client"""
+    global _shared_http_client
+    
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+        logger.info("Shared HTTP transport closed")
+
+
+# ========================================
+# CIRCUIT BREAKER
+# ========================================
+class CircuitOpenError(httpx.HTTPError):
+    """Request refused without contacting the site because its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one WordPress site
+    
+    closed: requests pass, consecutive failures are counted.
+    open: after failure_threshold failures requests fail fast for reset_timeout seconds.
+    half_open: one probe request passes; success closes the breaker, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize circuit breaker
+        
+        Args:
+            name: Site name for logs
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+    
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through"""
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+    
+    def allow(self) -> bool:
+        """Check whether a request may be sent (claims the probe when half-open)"""
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = self.HALF_OPEN
+            logger.info(f"Circuit breaker of {self.name} half-open, sending probe")
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+    
+    def record_success(self):
+        """Record a successful response"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit breaker of {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+    
+    def record_failure(self):
+        """Record a failed request"""
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            logger.warning(
+                f"Circuit breaker of {self.name} opened after {self.failures} failures "
+                f"(retry in {self.reset_timeout}s)"
+            )
+    
+    def release(self):
+        """Give back a claimed probe without a verdict (request cancelled)"""
+        self._probing = False
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+# Breaker states as metric values
+CIRCUIT_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Get circuit breaker of a site (shared by all clients of the same URL)"""
+    breaker = _circuit_breakers.get(url)
+    if breaker is None:
+        breaker = CircuitBreaker(url, WP_CIRCUIT_FAILURE_THRESHOLD, WP_CIRCUIT_RESET_TIMEOUT)
+        _circuit_breakers[url] = breaker
+    return breaker
+
+
+def retry_delay(attempt: int) -> float:
+    """Backoff before retry number attempt (0-based): exponential with full jitter"""
+    return random.uniform(0, min(WP_HTTP_RETRY_BACKOFF * 2 ** attempt, WP_HTTP_RETRY_BACKOFF_MAX))
+
+
+# ========================================
+# ADAPTIVE TIMEOUTS
+# ========================================
+class SiteLatency:
+    """
+    Recent response times of one WordPress site
+    
+    Percentiles of recent reads (GET) give their per-request httpx timeouts
+    and the hedging delay. Writes always get the fixed WP_HTTP_TIMEOUT: a
+    write cut short may still be applied by WordPress and is not retried,
+    so its response is worth waiting for.
+    """
+    
+    KINDS = ("read", "write")
+    
+    # New samples after which cached percentiles are recomputed
+    _RECOMPUTE_EVERY = 10
+    
+    def __init__(self, max_samples: int, min_samples: int):
+        """
+        Initialize latency tracker
+        
+        Args:
+            max_samples: Number of recent response times kept per kind
+            min_samples: Responses needed before percentiles are used
+        """
+        self.min_samples = max(min_samples, 1)
+        self._samples = {kind: deque(maxlen=max(max_samples, self.min_samples)) for kind in self.KINDS}
+        self._percentiles: Dict[str, Optional[Tuple[float, float]]] = {kind: None for kind in self.KINDS}
+        self._new_samples = {kind: 0 for kind in self.KINDS}
+    
+    def observe(self, kind: str, seconds: float):
+        """Record a response time (or the time until a request timed out)"""
+        self._samples[kind].append(seconds)
+        self._new_samples[kind] += 1
+    
+    def percentiles(self, kind: str) -> Optional[Tuple[float, float]]:
+        """
+        Get p95 and p99 of recent response times
+        
+        Args:
+            kind: "read" or "write"
+        
+        Returns:
+            (p95, p99) in seconds, or None while there are too few samples
+        """
+        samples = self._samples[kind]
+        if len(samples) < self.min_samples:
+            return None
+        if self._percentiles[kind] is None or self._new_samples[kind] >= self._RECOMPUTE_EVERY:
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            self._percentiles[kind] = (
+                ordered[min(int(len(ordered) * 0.95), last)],
+                ordered[min(int(len(ordered) * 0.99), last)]
+            )
+            self._new_samples[kind] = 0
+        return self._percentiles[kind]
+    
+    def read_timeout(self, kind: str) -> float:
+        """Seconds to wait for the response of a request of this kind"""
+        percentiles = self.percentiles(kind) if kind == "read" else None
+        if percentiles is None:
+            return WP_HTTP_TIMEOUT
+        return min(max(percentiles[1] * WP_HTTP_TIMEOUT_MULTIPLIER, WP_HTTP_TIMEOUT_MIN), WP_HTTP_TIMEOUT)
+    
+    def timeout(self, kind: str) -> httpx.Timeout:
+        """httpx timeouts for a request of this kind"""
+        read = self.read_timeout(kind)
+        return httpx.Timeout(
+            connect=min(WP_HTTP_CONNECT_TIMEOUT, read),
+            read=read,
+            write=WP_HTTP_WRITE_TIMEOUT,
+            pool=read
+        )
+    
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a read is hedged (None while there are too few samples)"""
+        percentiles = self.percentiles("read")
+        return None if percentiles is None else max(percentiles[0], WP_HEDGE_MIN_DELAY)
+
+
+_site_latencies: Dict[str, SiteLatency] = {}
+
+
+def get_site_latency(url: str) -> SiteLatency:
+    """Get latency tracker of a site (shared by all clients of the same URL)"""
+    latency = _site_latencies.get(url)
+    if latency is None:
+        latency = SiteLatency(WP_LATENCY_SAMPLES, WP_LATENCY_MIN_SAMPLES)
+        _site_latencies[url] = latency
+    return latency
+
+
+# ========================================
+# REQUEST COALESCING
+# ========================================
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls
+    
+    The first caller of a key starts the call in its own task; callers
+    arriving while it runs wait for the same result (or exception). The
+    call is cancelled only when every waiting caller has been cancelled.
+    """
+    
+    def __init__(self):
+        # key -> [task, number of waiting callers]
+        self._calls: Dict[Any, List] = {}
+    
+    def __contains__(self, key: Any) -> bool:
+        return key in self._calls
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call() unless a call with the same key is running, then wait for its result
+        
+        Args:
+            key: Hashable identity of the call
+            call: Coroutine function making the call
+        
+        Returns:
+            Result of the (shared) call
+        """
+        entry = self._calls.get(key)
+        if entry is None:
+            entry = [asyncio.create_task(call()), 0]
+            self._calls[key] = entry
+            
+            def forget(_task, entry=entry):
+                if self._calls.get(key) is entry:
+                    del self._calls[key]
+            
+            entry[0].add_done_callback(forget)
+        
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+
+
+# In-flight WordPress GETs (shared by all clients)
+_get_flights = SingleFlight()
+
+
+# ========================================
+# READ CACHE
+# ========================================
+class _CachedResponse:
+    """Read cache entry with validators for conditional requests"""
+    
+    __slots__ = ("result", "etag", "last_modified", "fetched_at")
+    
+    def __init__(self, result: Dict[str, Any], etag: Optional[str], last_modified: Optional[str]):
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+    
+    def age(self) -> float:
+        """Seconds since the entry was fetched or last revalidated"""
+        return time.monotonic() - self.fetched_at
+
+
+class SiteReadCache:
+    """
+    Read-through cache of GET results for one WordPress site
+    
+    Writes to the site call invalidate(), which drops all entries and bumps
+    the generation so that refreshes started before the write are discarded.
+    With a shared_key the generation is also bumped in shared_state. Other
+    workers re-read it in the background, at most every shared_ttl, and drop
+    their entries when it changed. Shared state is read and written in
+    threads, never on the event loop.
+    """
+    
+    def __init__(self, max_entries: int, shared_key: Optional[str] = None, shared_ttl: float = 1.0):
+        """
+        Initialize read cache
+        
+        Args:
+            max_entries: Maximum number of cached responses (LRU eviction)
+            shared_key: Generation key in shared_state (None = this process only)
+            shared_ttl: Seconds between re-reads of the shared generation
+        """
+        self.max_entries = max(max_entries, 1)
+        self.generation = 0
+        self.shared_key = shared_key
+        self.shared_ttl = shared_ttl
+        self._shared_generation = 0
+        self._next_shared_check = 0.0
+        self._shared_tasks: set = set()
+        self._checking = False
+        self._entries: "OrderedDict[Any, _CachedResponse]" = OrderedDict()
+        self._refreshing: Dict[Any, asyncio.Task] = {}
+    
+    def _in_background(self, coro):
+        """Run a shared state update without waiting for it"""
+        task = asyncio.create_task(coro)
+        self._shared_tasks.add(task)
+        task.add_done_callback(self._shared_tasks.discard)
+    
+    def _check_shared(self):
+        """Re-read the shared generation in the background once shared_ttl has passed"""
+        if self.shared_key is None or self._checking or time.monotonic() < self._next_shared_check:
+            return
+        self._checking = True
+        self._next_shared_check = time.monotonic() + self.shared_ttl
+        self._in_background(self._read_shared())
+    
+    async def _read_shared(self):
+        """Drop all entries if another worker wrote to the site"""
+        try:
+            shared_generation = await asyncio.to_thread(shared_state.get_generation, self.shared_key)
+        except Exception as e:
+            logger.warning(f"Failed to read shared cache generation: {e}")
+            return
+        finally:
+            self._checking = False
+        if shared_generation != self._shared_generation:
+            self._entries.clear()
+            self.generation += 1
+            self._shared_generation = shared_generation
+    
+    async def _bump_shared(self):
+        """Tell other workers that the site was written to"""
+        try:
+            self._shared_generation = await asyncio.to_thread(shared_state.bump_generation, self.shared_key)
+        except Exception as e:
+            logger.warning(f"Failed to bump shared cache generation: {e}")
+    
+    def get(self, key: Any) -> Optional[_CachedResponse]:
+        """Get cached entry"""
+        self._check_shared()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key: Any, entry: _CachedResponse, generation: int):
+        """Store entry unless the cache was invalidated since generation"""
+        if generation != self.generation:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """Drop all entries (called after writes to the site)"""
+        self._entries.clear()
+        self.generation += 1
+        if self.shared_key is not None:
+            self._in_background(self._bump_shared())
+    
+    def refresh_in_background(self, key: Any, refresh):
+        """
+        Run refresh() in the background unless a refresh for key is running
+        
+        Args:
+            key: Cache key
+            refresh: Coroutine function that fetches and stores the entry
+        """
+        if key in self._refreshing:
+            return
+        
+        async def run():
+            try:
+                await refresh()
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+        
+        self._refreshing[key] = asyncio.create_task(run())
+
+
+_read_caches: Dict[str, SiteReadCache] = {}
+
+
+def get_read_cache(url: str) -> SiteReadCache:
+    """Get read cache of a site (shared by all clients of the same URL)"""
+    cache = _read_caches.get(url)
+    if cache is None:
+        cache = SiteReadCache(
+            WP_POSTS_CACHE_MAX_ENTRIES,
+            f"read_cache:{url}" if MCP_SHARED_STATE else None,
+            MCP_SHARED_GENERATION_TTL
+        )
+        _read_caches[url] = cache
+    return cache
+
+
+# Post fields available in get_posts, mapped to WordPress REST API fields
+POST_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "excerpt": "excerpt",
+    "content": "content",
+    "url": "link",
+    "status": "status",
+    "date": "date",
+    "modified": "modified",
+    "slug": "slug",
+    "author": "author",
+    "categories": "categories",
+    "tags": "tags",
+    "featured_media": "featured_media"
+}
+
+# Fields returned by get_posts when none are requested
+DEFAULT_POST_FIELDS = ("id", "title", "excerpt", "url", "status", "date")
+
+# Fields WordPress returns as {"rendered": ...}
+RENDERED_POST_FIELDS = ("title", "excerpt", "content")
+
+
+def project_post(post: Dict[str, Any], fields) -> Dict[str, Any]:
+    """
+    Extract requested fields from a WordPress REST API post object
+    
+    Args:
+        post: Post object as returned by /wp-json/wp/v2/posts
+        fields: Field names from POST_FIELDS
+    
+    Returns:
+        Dictionary with the requested fields
+    """
+    result = {}
+    for field in fields:
+        value = post.get(POST_FIELDS[field])
+        if field in RENDERED_POST_FIELDS:
+            value = (value or {}).get('rendered', '')
+        result[field] = value
+    return result
+
+
 class WordPressMCP:
     """WordPress MCP client for managing WordPress posts via REST API"""
     
@@ -183,13 +1365,168 @@ class WordPressMCP:
             password: WordPress application password
         """
         self.url = url.rstrip('/') + '/wp-json/wp/v2'
-        self.client = httpx.AsyncClient(
-            auth=(username, password),
-            timeout=30.0,
-            headers={'Content-Type': 'application/json'}
-        )
+        self.host = httpx.URL(self.url).host
+        self.auth = httpx.BasicAuth(username, password)
+        # Identifies the credentials in shared keys without keeping the password
+        self.credentials = WordPressClientPool.fingerprint(self.url, username, password)
+        self.cache = get_read_cache(self.url)
+        self.breaker = get_circuit_breaker(self.url)
+        self.latency = get_site_latency(self.url)
+        self.in_flight = 0
         logger.info(f"WordPress MCP client initialized for {url}")
     
+    # Responses after which a GET is retried
+    RETRY_STATUSES = (502, 503, 504)
+    
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send request to the WordPress REST API
+        
+        Identical concurrent GETs (same site, credentials, path, query and
+        headers) share one upstream request and its response. GETs started
+        after a write invalidated the read cache do not join earlier ones.
+        
+        Args:
+            method: HTTP method
+            path: Path relative to /wp-json/wp/v2
+            **kwargs: Extra arguments for httpx (json, params, ...)
+        
+        Returns:
+            httpx response
+        
+        Raises:
+            CircuitOpenError: If the site's circuit breaker is open
+            httpx.HTTPError: If the request failed
+        """
+        if method != "GET" or not set(kwargs) <= {"params", "headers"}:
+            return await self._request_with_retries(method, path, **kwargs)
+        
+        key = (
+            self.url + path,
+            self.credentials,
+            self.cache.generation,
+            tuple(sorted(httpx.QueryParams(kwargs.get("params")).multi_items())),
+            tuple(sorted((name.lower(), value) for name, value in (kwargs.get("headers") or {}).items()))
+        )
+        if key in _get_flights:
+            COALESCED_REQUESTS.inc(host=self.host)
+        return await _get_flights.do(key, lambda: self._request_with_retries(method, path, **kwargs))
+    
+    async def _request_with_retries(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Send request through the site's circuit breaker
+        
+        GETs are retried after connection errors, timeouts and RETRY_STATUSES
+        with jittered exponential backoff; other methods are sent once.
+        """
+        attempts = 1 + (max(WP_HTTP_GET_RETRIES, 0) if method == "GET" else 0)
+        self.in_flight += 1
+        try:
+            for attempt in range(attempts):
+                if not self.breaker.allow():
+                    CIRCUIT_REJECTIONS.inc(host=self.host)
+                    raise CircuitOpenError(
+                        f"{self.host} is unavailable after repeated failures, "
+                        f"retry in {max(self.breaker.retry_after(), 1):.0f}s"
+                    )
+                last_attempt = attempt + 1 == attempts
+                try:
+                    if method == "GET":
+                        response = await self._send_hedged(path, **kwargs)
+                    else:
+                        response = await self._send(method, path, **kwargs)
+                except httpx.TransportError as e:
+                    self.breaker.record_failure()
+                    if last_attempt:
+                        raise
+                    logger.warning(f"{method} {self.host}{path} failed ({e!r}), retrying")
+                except BaseException:
+                    # Cancelled or invalid request: says nothing about the site
+                    self.breaker.release()
+                    raise
+                else:
+                    if response.status_code < 500:
+                        self.breaker.record_success()
+                        return response
+                    self.breaker.record_failure()
+                    if last_attempt or response.status_code not in self.RETRY_STATUSES:
+                        return response
+                    logger.warning(f"{method} {self.host}{path} returned {response.status_code}, retrying")
+                UPSTREAM_RETRIES.inc(host=self.host)
+                await asyncio.sleep(retry_delay(attempt))
+        finally:
+            self.in_flight -= 1
+            if method != "GET":
+                # Writes (even failed ones) may have changed what reads return
+                self.cache.invalidate()
+    
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send one request within the per-host concurrency limit, with the site's adaptive timeouts"""
+        kind = "read" if method == "GET" else "write"
+        async with _host_semaphore(self.host):
+            started = time.perf_counter()
+            status = "error"
+            try:
+                # Looked up per request: the shared client is recreated after close_shared_http_client()
+                response = await get_shared_http_client().request(
+                    method, f"{self.url}{path}", auth=self.auth, timeout=self.latency.timeout(kind), **kwargs
+                )
+                status = str(response.status_code)
+                if response.status_code < 500 and kind == "read":
+                    self.latency.observe(kind, time.perf_counter() - started)
+                return response
+            except httpx.TimeoutException:
+                # Counted at the timeout, so the timeout grows if the site got slower
+                if kind == "read":
+                    self.latency.observe(kind, time.perf_counter() - started)
+                raise
+            finally:
+                UPSTREAM_REQUESTS.inc(host=self.host, method=method, status=status)
+                UPSTREAM_DURATION.observe(time.perf_counter() - started, host=self.host, method=method)
+    
+    async def _send_hedged(self, path: str, **kwargs) -> httpx.Response:
+        """
+        Send a GET, hedged when WP_HEDGE_READS is on
+        
+        If no response arrived within the site's p95 read time and the host
+        has a free request slot, a second identical GET is sent and whichever
+        succeeds first is used; the other one is cancelled. The time the loser
+        ran is recorded as a (lower bound) sample, otherwise hedging would
+        hide the slow responses that set the timeouts.
+        """
+        delay = self.latency.hedge_delay() if WP_HEDGE_READS else None
+        if delay is None:
+            return await self._send("GET", path, **kwargs)
+        
+        started = time.perf_counter()
+        primary = asyncio.create_task(self._send("GET", path, **kwargs))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or _host_semaphore(self.host).locked():
+                return await primary
+            
+            hedge_started = time.perf_counter()
+            hedge = asyncio.create_task(self._send("GET", path, **kwargs))
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        HEDGED_REQUESTS.inc(host=self.host, winner="hedge" if task is hedge else "primary")
+                        now = time.perf_counter()
+                        for loser in pending:
+                            self.latency.observe("read", now - (hedge_started if loser is hedge else started))
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
     async def create_post(
         self, 
         title: str, 
@@ -219,10 +1556,7 @@ class WordPressMCP:
                 "status": status
             }
             
-            response = await self.client.post(
-                f"{self.url}/posts",
-                json=data
-            )
+            response = await self._request("POST", "/posts", json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -285,10 +1619,7 @@ class WordPressMCP:
                     "message": "No fields to update"
                 }
             
-            response = await self.client.post(
-                f"{self.url}/posts/{post_id}",
-                json=data
-            )
+            response = await self._request("POST", f"/posts/{post_id}", json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -315,7 +1646,9 @@ class WordPressMCP:
     async def get_posts(
         self, 
         per_page: int = 10, 
-        page: int = 1
+        page: int = 1,
+        fields: Optional[List[str]] = None,
+        query: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Get list of WordPress posts
@@ -323,47 +1656,25 @@ class WordPressMCP:
         Args:
             per_page: Number of posts per page (1-100)
             page: Page number
+            fields: Post fields to return (see POST_FIELDS, default: DEFAULT_POST_FIELDS)
+            query: Extra REST query parameters (e.g. {"search": "yoga"})
             
         Returns:
-            Dictionary with success status, posts list, count, and message
+            Dictionary with success status, posts list, count, page, total,
+            total_pages, and message
         """
         try:
+            fields = self._check_post_fields(fields)
             logger.info(f"Getting posts: per_page={per_page}, page={page}")
+            return await self._get_posts_page(per_page, page, fields, query)
             
-            params = {
-                "per_page": min(max(per_page, 1), 100),
-                "page": max(page, 1)
-            }
-            
-            response = await self.client.get(
-                f"{self.url}/posts",
-                params=params
-            )
-            response.raise_for_status()
-            
-            posts = response.json()
-            
-            # Extract relevant post information
-            post_list = []
-            for post in posts:
-                post_list.append({
-                    "id": post.get('id'),
-                    "title": post.get('title', {}).get('rendered', ''),
-                    "excerpt": post.get('excerpt', {}).get('rendered', ''),
-                    "url": post.get('link'),
-                    "status": post.get('status'),
-                    "date": post.get('date')
-                })
-            
-            logger.info(f"Retrieved {len(post_list)} posts")
-            
+        except ValueError as e:
             return {
-                "success": True,
-                "posts": post_list,
-                "count": len(post_list),
-                "message": f"Retrieved {len(post_list)} posts"
+                "success": False,
+                "posts": [],
+                "count": 0,
+                "message": str(e)
             }
-            
         except httpx.HTTPError as e:
             logger.error(f"Failed to get posts: {e}")
             return {
@@ -373,6 +1684,198 @@ class WordPressMCP:
                 "message": f"Error getting posts: {str(e)}"
             }
     
+    async def iter_post_pages(
+        self,
+        per_page: int = 100,
+        start_page: int = 1,
+        fields: Optional[List[str]] = None,
+        max_pages: Optional[int] = None,
+        query: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walk all pages of posts, fetching page N+1 while page N is processed
+        
+        Args:
+            per_page: Number of posts per page (1-100)
+            start_page: First page to fetch
+            fields: Post fields to return (see POST_FIELDS, default: DEFAULT_POST_FIELDS)
+            max_pages: Stop after this many pages (optional)
+            query: Extra REST API query parameters (orderby, modified_after, status, ...)
+            cache: Use the read cache (disable for one-off walks such as mirror syncs)
+        
+        Yields:
+            Page results as returned by get_posts
+        
+        Raises:
+            ValueError: If fields contains unknown names
+            httpx.HTTPError: If a page cannot be fetched
+        """
+        fields = self._check_post_fields(fields)
+        page = max(start_page, 1)
+        pages_done = 0
+        next_page = asyncio.create_task(self._get_posts_page(per_page, page, fields, query, cache))
+        
+        try:
+            while next_page is not None:
+                result = await next_page
+                next_page = None
+                pages_done += 1
+                
+                if result.get("next_page") and (max_pages is None or pages_done < max_pages):
+                    next_page = asyncio.create_task(
+                        self._get_posts_page(per_page, result["next_page"], fields, query, cache)
+                    )
+                
+                yield result
+        finally:
+            # Walk ended early (break, error or aclose()): drop the prefetch
+            if next_page is not None:
+                next_page.cancel()
+                # A prefetch that already failed must not be logged as unretrieved
+                next_page.add_done_callback(lambda task: task.cancelled() or task.exception())
+    
+    @staticmethod
+    def _check_post_fields(fields: Optional[List[str]]) -> List[str]:
+        """Validate requested post fields (ValueError on unknown names)"""
+        fields = list(fields) if fields else list(DEFAULT_POST_FIELDS)
+        unknown = [field for field in fields if field not in POST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(POST_FIELDS)}")
+        return fields
+    
+    async def _get_posts_page(
+        self,
+        per_page: int,
+        page: int,
+        fields: List[str],
+        query: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> Dict[str, Any]:
+        """Get one page of posts through the read cache (raises httpx.HTTPError)"""
+        # Only the projected fields are sent over the network
+        params = {
+            **(query or {}),
+            "per_page": min(max(per_page, 1), 100),
+            "page": max(page, 1),
+            "_fields": ",".join(POST_FIELDS[field] for field in fields)
+        }
+        if not cache:
+            return await self._fetch_posts(params, fields)
+        
+        key = ("posts", self.credentials, tuple(sorted(params.items())))
+        
+        cached = self.cache.get(key)
+        if cached is not None:
+            age = cached.age()
+            if age < WP_POSTS_CACHE_TTL:
+                return dict(cached.result)
+            if age < WP_POSTS_CACHE_STALE_TTL:
+                self.cache.refresh_in_background(
+                    key, lambda: self._fetch_posts(params, fields, key, cached)
+                )
+                return dict(cached.result)
+        
+        return dict(await self._fetch_posts(params, fields, key, cached))
+    
+    async def _fetch_posts(
+        self,
+        params: Dict[str, Any],
+        fields: List[str],
+        key: Any = None,
+        cached: Optional[_CachedResponse] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch a page of posts and store it in the read cache
+        
+        Args:
+            params: Query parameters
+            fields: Post fields to return
+            key: Read cache key (None = do not cache)
+            cached: Cached entry to revalidate with If-None-Match / If-Modified-Since
+        
+        Returns:
+            Dictionary with success status, posts list, count, and message
+        """
+        generation = self.cache.generation
+        
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        
+        response = await self._request("GET", "/posts", params=params, headers=headers)
+        
+        if response.status_code == 304 and cached is not None:
+            cached.fetched_at = time.monotonic()
+            logger.info("Posts not modified, using cached copy")
+            return cached.result
+        
+        response.raise_for_status()
+        
+        posts = response.json()
+        
+        # Extract relevant post information
+        post_list = [project_post(post, fields) for post in posts]
+        
+        logger.info(f"Retrieved {len(post_list)} posts")
+        
+        # Pagination headers (missing if a plugin strips them)
+        total = response.headers.get("X-WP-Total")
+        total_pages = response.headers.get("X-WP-TotalPages")
+        total = int(total) if total and total.isdigit() else None
+        total_pages = int(total_pages) if total_pages and total_pages.isdigit() else None
+        
+        page = params["page"]
+        if total_pages is not None:
+            has_next = page < total_pages
+        else:
+            has_next = len(post_list) == params["per_page"]
+        
+        result = {
+            "success": True,
+            "posts": post_list,
+            "count": len(post_list),
+            "page": page,
+            "total": total,
+            "total_pages": total_pages,
+            "next_page": page + 1 if has_next else None,
+            "message": f"Retrieved {len(post_list)} posts"
+        }
+        if key is not None:
+            self.cache.put(
+                key,
+                _CachedResponse(result, response.headers.get("ETag"), response.headers.get("Last-Modified")),
+                generation
+            )
+        return result
+    
+    async def get_post(self, post_id: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get a single WordPress post
+        
+        Args:
+            post_id: Post ID
+            fields: Post fields to return (see POST_FIELDS, default: DEFAULT_POST_FIELDS)
+        
+        Returns:
+            Post dict with the requested fields
+        
+        Raises:
+            ValueError: If fields contains unknown names
+            httpx.HTTPError: If the post cannot be fetched
+        """
+        fields = self._check_post_fields(fields)
+        response = await self._request(
+            "GET",
+            f"/posts/{post_id}",
+            params={"_fields": ",".join(POST_FIELDS[field] for field in fields)}
+        )
+        response.raise_for_status()
+        return project_post(response.json(), fields)
+    
     async def delete_post(self, post_id: int) -> Dict[str, Any]:
         """
         Delete a WordPress post
@@ -386,9 +1889,7 @@ class WordPressMCP:
         try:
             logger.info(f"Deleting post ID: {post_id}")
             
-            response = await self.client.delete(
-                f"{self.url}/posts/{post_id}"
-            )
+            response = await self._request("DELETE", f"/posts/{post_id}")
             response.raise_for_status()
             
             logger.info(f"Post deleted successfully: ID={post_id}")
@@ -408,9 +1909,250 @@ class WordPressMCP:
             }
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
-        logger.info("WordPress MCP client closed")
+        """Release the client (the shared HTTP transport stays open)"""
+        logger.info(f"WordPress MCP client closed for {self.url}")
+    
+    async def close_when_idle(self, poll_interval: float = 0.1):
+        """Release the client once no requests are in flight"""
+        while self.in_flight:
+            await asyncio.sleep(poll_interval)
+        await self.close()
+
+
+# ========================================
+# LOCAL POST MIRROR
+# ========================================
+class PostMirrorSync:
+    """
+    Keeps the local post mirror (wordpress_post_mirror) in sync
+    
+    All sites in the registry are synced in the background; writes made
+    through the tools are applied to the mirror right away. With shared
+    state only the worker holding the sync lease runs sync rounds. Mirror
+    reads run in a thread, off the event loop.
+    """
+    
+    LEASE_NAME = "post_mirror_sync"
+    
+    def __init__(
+        self,
+        enabled: bool,
+        interval: float,
+        full_sync_interval: float,
+        concurrency: int,
+        shared: bool = False
+    ):
+        """
+        Initialize mirror sync
+        
+        Args:
+            enabled: Run background syncs and serve reads from the mirror
+            interval: Seconds between sync rounds
+            full_sync_interval: Seconds between full syncs of a site
+            concurrency: Number of sites synced at the same time
+            shared: Coordinate sync rounds of several workers with a lease
+        """
+        self.enabled = enabled
+        self.interval = interval
+        self.full_sync_interval = full_sync_interval
+        self.concurrency = max(concurrency, 1)
+        self.shared = shared
+        # The holder renews the lease every round; another worker takes over
+        # when it has not been renewed for two intervals plus a slow round
+        self.lease_ttl = interval * 2 + 600
+        self._task: Optional[asyncio.Task] = None
+        self._pending: set = set()
+    
+    async def sync_site(self, site_id: str) -> Dict[str, Any]:
+        """Sync the mirror of one site"""
+        site_config = site_registry.get(site_id)
+        client = get_wordpress_client(site_id, record_usage=False)
+        return await post_mirror.sync_site(site_id, site_config["url"], client, self.full_sync_interval)
+    
+    async def sync_all(self):
+        """Sync all registered sites and drop mirrors of removed sites"""
+        sites = site_registry.all()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def sync_one(site_id: str):
+            async with semaphore:
+                try:
+                    await self.sync_site(site_id)
+                except Exception as e:
+                    logger.error(f"Mirror sync of '{site_id}' failed: {e}")
+        
+        await asyncio.gather(*(sync_one(site_id) for site_id in sites))
+        
+        for site_id in await asyncio.to_thread(post_mirror.get_mirrored_sites):
+            if site_id not in sites:
+                logger.info(f"Site '{site_id}' was removed, dropping its mirror")
+                await asyncio.to_thread(post_mirror.reset_site, site_id)
+    
+    async def _acquire_lease(self) -> bool:
+        """Take or renew the sync lease (always True without shared state)"""
+        if not self.shared:
+            return True
+        try:
+            return await asyncio.to_thread(shared_state.acquire_lease, self.LEASE_NAME, worker_id(), self.lease_ttl)
+        except Exception as e:
+            logger.error(f"Failed to acquire mirror sync lease: {e}")
+            return False
+    
+    async def _run(self):
+        """Sync all sites periodically"""
+        while True:
+            if await self._acquire_lease():
+                await self.sync_all()
+            await asyncio.sleep(self.interval)
+    
+    def start(self):
+        """Start background syncing"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop background syncing"""
+        tasks = list(self._pending)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.shared and self.enabled:
+            try:
+                await asyncio.to_thread(shared_state.release_lease, self.LEASE_NAME, worker_id())
+            except Exception as e:
+                logger.warning(f"Failed to release mirror sync lease: {e}")
+    
+    async def can_serve(self, site_id: str, fields: Optional[List[str]] = None) -> bool:
+        """Check whether reads for a site can be served from the mirror"""
+        if not self.enabled:
+            return False
+        if fields and any(field not in post_mirror.MIRROR_FIELDS for field in fields):
+            return False
+        try:
+            return await asyncio.to_thread(post_mirror.is_synced, site_id)
+        except Exception as e:
+            logger.error(f"Failed to check mirror state of '{site_id}': {e}")
+            return False
+    
+    async def synced_sites(self, site_ids: List[str]) -> List[str]:
+        """Filter sites down to those whose reads can be served from the mirror (one query)"""
+        if not self.enabled:
+            return []
+        try:
+            return await asyncio.to_thread(post_mirror.synced_sites, site_ids)
+        except Exception as e:
+            logger.error(f"Failed to check mirror state: {e}")
+            return []
+    
+    async def read_posts(
+        self,
+        site_id: str,
+        per_page: int,
+        page: int,
+        fields: Optional[List[str]],
+        max_pages: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Read posts from the mirror (same result shape as WordPressMCP.get_posts)
+        
+        Args:
+            site_id: Site ID
+            per_page: Number of posts per page (1-100)
+            page: First page
+            fields: Post fields to return (default: DEFAULT_POST_FIELDS)
+            max_pages: Number of pages to collect
+        
+        Returns:
+            Dictionary with success status, posts list, count, total, total_pages, and message
+        """
+        fields = list(fields) if fields else list(DEFAULT_POST_FIELDS)
+        
+        def query_pages() -> Tuple[Dict[str, Any], int]:
+            result = post_mirror.query_posts(site_id, per_page, page, fields)
+            pages = 1
+            while pages < max_pages and result["next_page"]:
+                next_result = post_mirror.query_posts(site_id, per_page, result["next_page"], fields)
+                result["posts"].extend(next_result["posts"])
+                result["next_page"] = next_result["next_page"]
+                pages += 1
+            return result, pages
+        
+        result, pages = await asyncio.to_thread(query_pages)
+        result["count"] = len(result["posts"])
+        result["message"] = f"Retrieved {result['count']} posts"
+        if max_pages > 1:
+            result["pages"] = pages
+        result["source"] = "mirror"
+        return result
+    
+    async def search(
+        self,
+        query: str,
+        site_ids: Optional[List[str]],
+        limit: int,
+        owned_site_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Full-text search in the mirror
+        
+        Args:
+            query: Search words
+            site_ids: Sites to search (None = all sites)
+            limit: Maximum number of results
+            owned_site_ids: Sites of the caller, whose drafts and private posts match too
+        
+        Returns:
+            Dictionary with success status, results, count, source, and message
+        """
+        results = await asyncio.to_thread(
+            post_mirror.search_posts, query, site_ids, limit, "publish", owned_site_ids
+        )
+        for result in results:
+            result["site_name"] = site_registry.site_name(result["site_id"])
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "source": "mirror",
+            "message": f"Found {len(results)} posts"
+        }
+    
+    def post_changed(self, site_id: str, client: WordPressMCP, post_id: Optional[int]):
+        """Fetch a created or updated post into the mirror in the background"""
+        if not self.enabled or not post_id:
+            return
+        
+        async def refresh():
+            try:
+                post = await client.get_post(post_id, list(post_mirror.MIRROR_FIELDS))
+                await asyncio.to_thread(post_mirror.upsert_posts, site_id, [post])
+            except Exception as e:
+                logger.warning(f"Failed to mirror post {post_id} of '{site_id}': {e}")
+        
+        task = asyncio.create_task(refresh())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def post_deleted(self, site_id: str, post_id: int):
+        """Remove a deleted post from the mirror"""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(post_mirror.delete_post, site_id, post_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove post {post_id} of '{site_id}' from mirror: {e}")
+
+
+post_mirror_sync = PostMirrorSync(
+    WP_MIRROR_ENABLED,
+    WP_MIRROR_SYNC_INTERVAL,
+    WP_MIRROR_FULL_SYNC_INTERVAL,
+    WP_MIRROR_SYNC_CONCURRENCY,
+    MCP_SHARED_STATE
+)
 
 
 # Initialize FastMCP server
@@ -418,8 +2160,17 @@ class WordPressMCP:
 mcp = FastMCP(
     "WordPress MCP Server",
     instructions="WordPress MCP Server for managing WordPress posts via ChatGPT",
+    # Production and local hostnames; FastMCP's default only allows localhost
+    transport_security=TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=[host.strip() for host in MCP_ALLOWED_HOSTS.split(",") if host.strip()],
+        allowed_origins=[origin.strip() for origin in MCP_ALLOWED_ORIGINS.split(",") if origin.strip()]
+    ),
     streamable_http_path="/mcp",
-    sse_path="/sse"
+    sse_path="/sse",
+    # Streamable HTTP sessions live in one process; with several workers every
+    # request must be answerable by whichever worker receives it
+    stateless_http=MCP_SHARED_STATE
 )
 
 # Initialize WordPress client
@@ -430,14 +2181,103 @@ logger.info("Initializing WordPress MCP client...")
 wp_client_instance = WordPressMCP(WORDPRESS_URL, WORDPRESS_USERNAME, WORDPRESS_PASSWORD)
 
 
+# ========================================
+# PROGRESS REPORTING
+# ========================================
+
+# Sink for notifications sent while a /sse request is being handled
+_notification_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("notification_sink", default=None)
+
+# progressToken of the /sse tools/call being handled (None = no progress wanted)
+_progress_token: ContextVar[Any] = ContextVar("progress_token", default=None)
+
+
+async def report_progress(
+    ctx: Optional[Context],
+    progress: float,
+    total: Optional[float] = None,
+    message: Optional[str] = None,
+    partial: Optional[Dict[str, Any]] = None
+):
+    """
+    Report progress of the running tool call to the client
+    
+    On /mcp this goes through the FastMCP context. On /sse a
+    notifications/progress event is sent, followed by a
+    notifications/partial_result event carrying the partial result.
+    Nothing is sent if the client did not pass a progressToken.
+    
+    Args:
+        ctx: FastMCP request context (None when called from /sse)
+        progress: Work done so far
+        total: Total amount of work (optional)
+        message: Progress message (optional)
+        partial: Result of the step that just finished (optional, /sse only)
+    """
+    if isinstance(ctx, Context):
+        try:
+            await ctx.report_progress(progress, total, message)
+        except Exception as e:
+            logger.warning(f"Failed to report progress: {e}")
+        return
+    
+    sink = _notification_sink.get()
+    token = _progress_token.get()
+    if sink is None or token is None:
+        return
+    
+    params = {"progressToken": token, "progress": progress}
+    if total is not None:
+        params["total"] = total
+    if message:
+        params["message"] = message
+    sink(encode_json({"jsonrpc": "2.0", "method": "notifications/progress", "params": params}))
+    if partial is not None:
+        sink(encode_json({
+            "jsonrpc": "2.0",
+            "method": "notifications/partial_result",
+            "params": {"progressToken": token, "result": partial}
+        }))
+
+
+async def gather_with_progress(
+    ctx: Optional[Context],
+    awaitables: List[Awaitable[Dict[str, Any]]],
+    label: str
+) -> List[Dict[str, Any]]:
+    """
+    Run awaitables concurrently like asyncio.gather, reporting each finished one
+    
+    Args:
+        ctx: FastMCP request context (None when called from /sse)
+        awaitables: Steps returning result dicts
+        label: Progress message prefix
+    
+    Returns:
+        Results in input order
+    """
+    total = len(awaitables)
+    done = 0
+    
+    async def run(awaitable: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        nonlocal done
+        result = await awaitable
+        done += 1
+        await report_progress(ctx, done, total, f"{label} {done}/{total}", result)
+        return result
+    
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+
 @mcp.tool()
+@instrument_tool
 async def create_post(
     title: str,
     content: str,
     excerpt: str = "",
     status: str = "publish",
     site: Optional[str] = None
-) -> str:
+) -> Dict[str, Any]:
     """
     Create a new WordPress post on your site
     
@@ -449,29 +2289,32 @@ async def create_post(
         site: Site ID to post to (optional). Use list_sites() to see all available sites including user-added connections. If not specified, uses default site.
     
     Returns:
-        JSON string with success status, post_id, url, and message
+        Dictionary with success status, post_id, url, and message
     """
     try:
-        client = get_wordpress_client(site)
+        site_id = resolve_site_id(site)
+        client = get_wordpress_client(site_id)
         result = await client.create_post(title, content, excerpt, status)
+        if result.get("success"):
+            post_mirror_sync.post_changed(site_id, client, result["post_id"])
         if site:
             result["site"] = site
-            all_sites = load_all_sites()
-            result["site_name"] = all_sites.get(site, {}).get("name", site)
-        return json.dumps(result, ensure_ascii=False)
+            result["site_name"] = site_registry.site_name(site)
+        return result
     except Exception as e:
         logger.error(f"Error creating post: {e}")
-        return json.dumps({"success": False, "message": str(e)}, ensure_ascii=False)
+        return {"success": False, "message": str(e)}
 
 
 @mcp.tool()
+@instrument_tool
 async def update_post(
     post_id: int,
     title: Optional[str] = None,
     content: Optional[str] = None,
     excerpt: Optional[str] = None,
     site: Optional[str] = None
-) -> str:
+) -> Dict[str, Any]:
     """
     Update an existing WordPress post
     
@@ -483,27 +2326,68 @@ async def update_post(
         site: Site ID where the post is located (optional). Use list_sites() to see all available sites including user-added connections. If not specified, uses default site.
     
     Returns:
-        JSON string with success status, post_id, url, and message
+        Dictionary with success status, post_id, url, and message
     """
     try:
-        client = get_wordpress_client(site)
+        site_id = resolve_site_id(site)
+        client = get_wordpress_client(site_id)
         result = await client.update_post(post_id, title, content, excerpt)
+        if result.get("success"):
+            post_mirror_sync.post_changed(site_id, client, post_id)
         if site:
             result["site"] = site
-            all_sites = load_all_sites()
-            result["site_name"] = all_sites.get(site, {}).get("name", site)
-        return json.dumps(result, ensure_ascii=False)
+            result["site_name"] = site_registry.site_name(site)
+        return result
     except Exception as e:
         logger.error(f"Error updating post: {e}")
-        return json.dumps({"success": False, "message": str(e)}, ensure_ascii=False)
+        return {"success": False, "message": str(e)}
+
+
+def encode_posts_cursor(site_id: str, page: int, per_page: int, fields: Optional[List[str]]) -> str:
+    """Encode get_posts continuation token"""
+    position = {"site": site_id, "page": page, "per_page": per_page, "fields": fields}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_posts_cursor(cursor: str, site_id: str) -> Dict[str, Any]:
+    """
+    Decode get_posts continuation token
+    
+    Args:
+        cursor: Token from encode_posts_cursor
+        site_id: Site the posts are requested from
+    
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another site
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_site = str(position["site"])
+        position = {
+            "page": int(position["page"]),
+            "per_page": int(position["per_page"]),
+            "fields": position.get("fields")
+        }
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_site != site_id:
+        raise ValueError(f"Cursor belongs to site '{cursor_site}', not '{site_id}'")
+    return position
 
 
 @mcp.tool()
+@instrument_tool
 async def get_posts(
     per_page: int = 10,
     page: int = 1,
-    site: Optional[str] = None
-) -> str:
+    site: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    iterate_all: bool = False,
+    max_pages: int = 10,
+    source: str = "auto",
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
     """
     Get list of WordPress posts
     
@@ -511,25 +2395,164 @@ async def get_posts(
         per_page: Number of posts per page (1-100, default: 10)
         page: Page number (default: 1)
         site: Site ID to get posts from (optional). Use list_sites() to see all available sites including user-added connections. If not specified, uses default site.
+        fields: Post fields to return (optional, default: id, title, excerpt, url, status, date). Also available: content, modified, slug, author, categories, tags, featured_media.
+        cursor: Continuation token from a previous call's next_cursor (optional, replaces page, per_page and fields; only valid for the same site)
+        iterate_all: Walk following pages too and return their posts together (default: false)
+        max_pages: Maximum number of pages to walk with iterate_all (default: 10)
+        source: Where to read from - "auto" (local mirror once the site is synced, else WordPress), "mirror" or "origin" (default: "auto")
+        ctx: Request context, injected by FastMCP (used for progress notifications)
     
     Returns:
-        JSON string with success status, posts list, count, and message
+        Dictionary with success status, posts list, count, total, total_pages,
+        next_cursor (if more posts remain), source, and message
     """
     try:
-        client = get_wordpress_client(site)
-        result = await client.get_posts(per_page, page)
+        site_id = resolve_site_id(site)
+        if cursor:
+            position = decode_posts_cursor(cursor, site_id)
+            page, per_page, fields = position["page"], position["per_page"], position["fields"]
+        per_page = min(max(per_page, 1), 100)
+        if source not in ("auto", "mirror", "origin"):
+            raise ValueError(f"Invalid source '{source}', expected auto, mirror or origin")
+        
+        use_mirror = source != "origin" and await post_mirror_sync.can_serve(site_id, fields)
+        if source == "mirror" and not use_mirror:
+            raise ValueError(f"Local mirror of site '{site_id}' is not available")
+        
+        if use_mirror:
+            result = await post_mirror_sync.read_posts(
+                site_id, per_page, page, fields, max(max_pages, 1) if iterate_all else 1
+            )
+        else:
+            client = get_wordpress_client(site_id)
+            if iterate_all:
+                result = await _walk_posts(client, per_page, page, fields, max_pages, ctx)
+            else:
+                result = await client.get_posts(per_page, page, fields)
+            result["source"] = "origin"
+        
+        if result.get("next_page"):
+            result["next_cursor"] = encode_posts_cursor(site_id, result["next_page"], per_page, fields)
         if site:
             result["site"] = site
-            all_sites = load_all_sites()
-            result["site_name"] = all_sites.get(site, {}).get("name", site)
-        return json.dumps(result, ensure_ascii=False)
+            result["site_name"] = site_registry.site_name(site)
+        return result
     except Exception as e:
         logger.error(f"Error getting posts: {e}")
-        return json.dumps({"success": False, "message": str(e)}, ensure_ascii=False)
+        return {"success": False, "message": str(e)}
+
+
+async def _walk_posts(
+    client: WordPressMCP,
+    per_page: int,
+    start_page: int,
+    fields: Optional[List[str]],
+    max_pages: int,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """Collect posts from up to max_pages pages starting at start_page, reporting each page"""
+    posts = []
+    pages = 0
+    last = {}
+    try:
+        # Closed on every exit, so a prefetched page is never left running
+        async with aclosing(client.iter_post_pages(per_page, start_page, fields, max(max_pages, 1))) as walk:
+            async for result in walk:
+                posts.extend(result["posts"])
+                pages += 1
+                last = result
+                total_pages = result.get("total_pages")
+                await report_progress(
+                    ctx,
+                    pages,
+                    min(max(max_pages, 1), total_pages - start_page + 1) if total_pages else None,
+                    f"Fetched page {result.get('page')}",
+                    {"page": result.get("page"), "posts": result["posts"]}
+                )
+    except ValueError as e:
+        return {"success": False, "posts": [], "count": 0, "message": str(e)}
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to get posts: {e}")
+        if not pages:
+            return {"success": False, "posts": [], "count": 0, "message": f"Error getting posts: {str(e)}"}
+        # Return what was collected and let the caller continue from the failed page
+        last = dict(last, next_page=start_page + pages)
+    
+    return {
+        "success": True,
+        "posts": posts,
+        "count": len(posts),
+        "pages": pages,
+        "total": last.get("total"),
+        "total_pages": last.get("total_pages"),
+        "next_page": last.get("next_page"),
+        "message": f"Retrieved {len(posts)} posts from {pages} pages"
+    }
+
+
+@mcp.tool()
+@instrument_tool
+async def search_posts(
+    query: str,
+    site: Optional[str] = None,
+    limit: int = 10,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Full-text search of WordPress posts (title, excerpt and content)
+    
+    Args:
+        query: Search words (all words must match, word prefixes match too)
+        site: Site ID to search (optional). Use list_sites() to see all available sites. If not specified, searches the built-in sites and your own connections.
+        limit: Maximum number of results (1-100, default: 10)
+        ctx: Request context, injected by FastMCP (identifies the caller)
+    
+    Returns:
+        Dictionary with success status, results (site, id, title, url, status,
+        date, snippet, score - best matches first), count, source, and message.
+        Drafts and private posts are only found on your own connections,
+        if the server allows it.
+    """
+    try:
+        limit = min(max(limit, 1), 100)
+        if not query or not query.strip():
+            raise ValueError("Search query is empty")
+        
+        # Without MCP_SEARCH_OWN_DRAFTS nobody owns a site here: published posts only
+        caller = current_caller(ctx) if MCP_SEARCH_OWN_DRAFTS else None
+        if site:
+            site_id = resolve_site_id(site)
+            if await post_mirror_sync.can_serve(site_id):
+                owned = caller is not None and site_registry.get(site_id).get("owner") == caller
+                result = await post_mirror_sync.search(query, [site_id], limit, [site_id] if owned else None)
+            else:
+                # Mirror not synced yet, ask WordPress
+                client = get_wordpress_client(site_id)
+                result = await client.get_posts(
+                    limit, 1, ["id", "title", "url", "date", "excerpt"], {"search": query}
+                )
+                result["results"] = result.pop("posts", [])
+                result["source"] = "origin"
+                for post in result["results"]:
+                    post["site_id"] = site_id
+            result["site"] = site
+            result["site_name"] = site_registry.site_name(site)
+        else:
+            sites = site_registry.visible(current_caller(ctx))
+            site_ids = await post_mirror_sync.synced_sites(list(sites))
+            # The only user connections visible to the caller are their own
+            owned = [site_id for site_id in site_ids if caller is not None and sites[site_id].get("user_connection")]
+            result = await post_mirror_sync.search(query, site_ids, limit, owned)
+            result["sites_searched"] = len(site_ids)
+        return result
+    except Exception as e:
+        logger.error(f"Error searching posts: {e}")
+        return {"success": False, "message": str(e)}
 
 
 @mcp.tool()
-async def delete_post(post_id: int, site: Optional[str] = None) -> str:
+@instrument_tool
+async def delete_post(post_id: int, site: Optional[str] = None) -> Dict[str, Any]:
     """
     Delete a WordPress post
     
@@ -538,62 +2561,662 @@ async def delete_post(post_id: int, site: Optional[str] = None) -> str:
         site: Site ID where the post is located (optional). Use list_sites() to see all available sites including user-added connections. If not specified, uses default site.
     
     Returns:
-        JSON string with success status, post_id, and message
+        Dictionary with success status, post_id, and message
     """
     try:
-        client = get_wordpress_client(site)
+        site_id = resolve_site_id(site)
+        client = get_wordpress_client(site_id)
         result = await client.delete_post(post_id)
+        if result.get("success"):
+            await post_mirror_sync.post_deleted(site_id, post_id)
         if site:
             result["site"] = site
-            all_sites = load_all_sites()
-            result["site_name"] = all_sites.get(site, {}).get("name", site)
-        return json.dumps(result, ensure_ascii=False)
+            result["site_name"] = site_registry.site_name(site)
+        return result
     except Exception as e:
         logger.error(f"Error deleting post: {e}")
-        return json.dumps({"success": False, "message": str(e)}, ensure_ascii=False)
+        return {"success": False, "message": str(e)}
+
+
+@mcp.tool()
+@instrument_tool
+async def bulk_create_posts(
+    posts: List[Dict[str, Any]],
+    concurrency_per_site: int = BULK_CONCURRENCY_PER_SITE,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Create many WordPress posts in one call, possibly on different sites
+    
+    Args:
+        posts: List of posts. Each post is an object with "title" and "content" (required) and optional "excerpt", "status" ("publish", "draft" or "private") and "site" (site ID, see list_sites())
+        concurrency_per_site: Maximum number of posts created at the same time on one site (default: 4, capped by the server at 16 unless configured otherwise)
+        ctx: Request context, injected by FastMCP (used for progress notifications)
+    
+    Returns:
+        Dictionary with a result per post (in input order), created and failed counts
+    """
+    concurrency_per_site = min(max(concurrency_per_site, 1), max(BULK_MAX_CONCURRENCY_PER_SITE, 1))
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    async def create_one(index: int, post: Any) -> Dict[str, Any]:
+        if not isinstance(post, dict) or not post.get("title") or post.get("content") is None:
+            return {
+                "index": index,
+                "success": False,
+                "post_id": None,
+                "url": None,
+                "message": "Each post needs 'title' and 'content'"
+            }
+        
+        site = post.get("site")
+        # Keyed by the resolved ID, so aliases of a site share its limit
+        site_id = resolve_site_id(site)
+        semaphore = semaphores.get(site_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(concurrency_per_site)
+            semaphores[site_id] = semaphore
+        
+        async with semaphore:
+            try:
+                client = get_wordpress_client(site_id)
+                result = await client.create_post(
+                    post["title"],
+                    post["content"],
+                    post.get("excerpt", ""),
+                    post.get("status", "publish")
+                )
+                if result.get("success"):
+                    post_mirror_sync.post_changed(site_id, client, result["post_id"])
+            except Exception as e:
+                logger.error(f"Error creating post #{index} in bulk: {e}")
+                result = {"success": False, "post_id": None, "url": None, "message": str(e)}
+        
+        result["index"] = index
+        if site:
+            result["site"] = site
+            result["site_name"] = site_registry.site_name(site)
+        return result
+    
+    results = await gather_with_progress(
+        ctx, [create_one(index, post) for index, post in enumerate(posts)], "Created post"
+    )
+    created = sum(1 for result in results if result.get("success"))
+    
+    return {
+        "success": created == len(results),
+        "results": results,
+        "created": created,
+        "failed": len(results) - created,
+        "message": f"Created {created} of {len(results)} posts"
+    }
+
+
+# Fields that can be used in publish_to_sites selectors
+SITE_SELECTOR_FIELDS = ("language", "owner")
+
+
+def parse_site_selector(selector: str) -> Dict[str, str]:
+    """
+    Parse site selector like "language=ru" or "language=uk,owner=john"
+    
+    Args:
+        selector: Comma separated field=value pairs
+    
+    Returns:
+        Dictionary mapping field to value
+    
+    Raises:
+        ValueError: If the selector is malformed or uses an unknown field
+    """
+    filters = {}
+    for part in selector.split(","):
+        if not part.strip():
+            continue
+        field, sep, value = part.partition("=")
+        field = field.strip()
+        if not sep or field not in SITE_SELECTOR_FIELDS or not value.strip():
+            raise ValueError(
+                f"Invalid selector '{part.strip()}', expected field=value with field one of: "
+                f"{', '.join(SITE_SELECTOR_FIELDS)}"
+            )
+        filters[field] = value.strip()
+    return filters
+
+
+@mcp.tool()
+@instrument_tool
+async def publish_to_sites(
+    title: str,
+    content: str,
+    excerpt: str = "",
+    status: str = "publish",
+    sites: Optional[List[str]] = None,
+    selector: Optional[str] = None,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """
+    Publish the same post to several WordPress sites at once
+    
+    Args:
+        title: Post title
+        content: Post content in HTML
+        excerpt: Post excerpt (optional)
+        status: Post status - "publish", "draft", or "private" (default: "publish")
+        sites: List of site IDs to publish to (optional). Use list_sites() to see all available sites.
+        selector: Select target sites by field instead of listing them (optional), e.g. "language=ru" (built-in sites), "owner=john" or "language=uk,owner=john" (your own connections, owner must be your username). Combined with 'sites' if both are given.
+        ctx: Request context, injected by FastMCP (used for progress notifications)
+    
+    Returns:
+        Dictionary with a result per site, published and failed counts
+    """
+    caller = current_caller(ctx)
+    try:
+        targets = {}
+        if selector:
+            filters = parse_site_selector(selector)
+            if "owner" in filters and filters["owner"] != caller:
+                raise ValueError(f"Selector owner '{filters['owner']}' is not the calling user")
+            targets.update(site_registry.select(**filters))
+        # Other users' connections are reported as not found
+        visible = site_registry.visible(caller) if sites else {}
+        for site_id in sites or []:
+            targets[site_id] = visible.get(site_id)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    
+    if not targets:
+        return {
+            "success": False,
+            "results": [],
+            "message": "No target sites: pass 'sites' or a 'selector' matching at least one site"
+        }
+    
+    async def publish_one(site_id: str, site_config: Optional[Dict]) -> Dict[str, Any]:
+        if site_config is None:
+            result = {"success": False, "post_id": None, "url": None, "message": f"Site '{site_id}' not found"}
+        else:
+            try:
+                client = get_wordpress_client(site_id)
+                result = await client.create_post(title, content, excerpt, status)
+                if result.get("success"):
+                    post_mirror_sync.post_changed(site_id, client, result["post_id"])
+            except Exception as e:
+                logger.error(f"Error publishing to site '{site_id}': {e}")
+                result = {"success": False, "post_id": None, "url": None, "message": str(e)}
+        result["site"] = site_id
+        result["site_name"] = site_config.get("name", site_id) if site_config else site_id
+        return result
+    
+    results = await gather_with_progress(
+        ctx, [publish_one(site_id, site_config) for site_id, site_config in targets.items()], "Published to site"
+    )
+    published = sum(1 for result in results if result.get("success"))
+    
+    return {
+        "success": published == len(results),
+        "results": results,
+        "published": published,
+        "failed": len(results) - published,
+        "message": f"Published '{title}' to {published} of {len(results)} sites"
+    }
+
+
+@mcp.tool()
+@instrument_tool
+async def list_sites(ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """
+    Get list of available WordPress sites (the default sites and your own user-added sites)
+    
+    Args:
+        ctx: Request context, injected by FastMCP (identifies the caller)
+    
+    Returns:
+        Dictionary with list of available sites with their IDs, names, URLs, and languages
+    """
+    sites_list = []
+    all_sites = site_registry.visible(current_caller(ctx))
+    
+    for site_id, site_config in all_sites.items():
+        site_info = {
+            "id": site_id,
+            "name": site_config.get("name", site_id),
+            "url": site_config.get("url", ""),
+            "language": site_config.get("language", "en"),
+            "is_default": site_id == DEFAULT_SITE,
+            "user_connection": site_config.get("user_connection", False)
+        }
+        
+        # Add owner info for user connections
+        if site_config.get("user_connection"):
+            site_info["owner"] = site_config.get("owner", "unknown")
+        
+        sites_list.append(site_info)
+    
+    return {
+        "success": True,
+        "sites": sites_list,
+        "default_site": DEFAULT_SITE,
+        "count": len(sites_list),
+        "user_connections_count": sum(1 for s in sites_list if s.get("user_connection"))
+    }
+
+
+# ========================================
+# SSE SESSIONS
+# ========================================
+
+class SSESession:
+    """
+    One open GET /sse stream
+    
+    Events for the client go through a bounded queue. When the client stops
+    reading, producers wait (backpressure) and new messages are refused.
+    """
+    
+    __slots__ = ("session_id", "owner", "queue", "created_at", "last_activity", "tasks", "closed")
+    
+    def __init__(self, session_id: str, queue_size: int, owner: Optional[str] = None):
+        """
+        Initialize session
+        
+        Args:
+            session_id: Random session ID
+            queue_size: Maximum number of queued outgoing events
+            owner: Username the session acts for (from MCP_USER_HEADER)
+        """
+        self.session_id = session_id
+        self.owner = owner
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
+        self.tasks: Dict[Any, asyncio.Task] = {}
+        self.closed = False
+    
+    def touch(self):
+        """Mark client activity"""
+        self.last_activity = time.monotonic()
+    
+    def is_full(self) -> bool:
+        """Check whether the client has stopped draining its events"""
+        return self.queue.full()
+    
+    async def send(self, event: ServerSentEvent):
+        """Queue an event for the client, waiting while the queue is full"""
+        if not self.closed:
+            await self.queue.put(event)
+
 
+def _valid_request_id(request_id: Any) -> bool:
+    """Check that a JSON-RPC request id is a string or an integer"""
+    return isinstance(request_id, (str, int)) and not isinstance(request_id, bool)
 
-@mcp.tool()
-async def list_sites() -> str:
+
+class SSESessionManager:
     """
-    Get list of available WordPress sites (both default and user-added sites)
+    Registry of open SSE sessions
     
-    Returns:
-        JSON string with list of available sites with their IDs, names, URLs, and languages
+    GET /sse opens a session and announces its message endpoint. Messages
+    POSTed to /sse/messages?session_id=... run in the background and their
+    responses go to the session stream. One shared timer sends heartbeats to
+    all sessions and closes sessions idle for longer than idle_timeout.
+    
+    With shared state, sessions are registered in shared_state. A message
+    POSTed to a worker that does not hold the session stream is queued
+    there and picked up by the holding worker within relay_interval.
+    Shared state calls run in threads, never on the event loop.
     """
-    sites_list = []
-    all_sites = load_all_sites()
     
-    for site_id, site_config in all_sites.items():
-        site_info = {
-            "id": site_id,
-            "name": site_config.get("name", site_id),
-            "url": site_config.get("url", ""),
-            "language": site_config.get("language", "en"),
-            "is_default": site_id == DEFAULT_SITE,
-            "user_connection": site_config.get("user_connection", False)
-        }
+    # Queued to make a session stream end
+    _CLOSE = object()
+    
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_timeout: float,
+        heartbeat_interval: float,
+        queue_size: int,
+        shared: bool = False,
+        relay_interval: float = 0.05
+    ):
+        """
+        Initialize session manager
         
-        # Add owner info for user connections
-        if site_config.get("user_connection"):
-            site_info["owner"] = site_config.get("owner", "unknown")
+        Args:
+            max_sessions: Maximum number of open sessions (per worker)
+            idle_timeout: Seconds without client messages before a session is closed
+            heartbeat_interval: Seconds between heartbeat events
+            queue_size: Maximum number of queued events per session
+            shared: Route messages between workers through shared_state
+            relay_interval: Seconds between checks for messages relayed by other workers
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_size = queue_size
+        self.shared = shared
+        self.relay_interval = relay_interval
+        self._sessions: Dict[str, SSESession] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._relay_task: Optional[asyncio.Task] = None
+        self._unregistering: set = set()
+    
+    async def open(self, owner: Optional[str] = None) -> Optional[SSESession]:
+        """
+        Open a new session
         
-        sites_list.append(site_info)
+        Args:
+            owner: Username the session acts for
+        
+        Returns:
+            New session, or None if the session limit is reached
+        """
+        if len(self._sessions) >= self.max_sessions:
+            logger.warning(f"SSE session limit reached ({self.max_sessions})")
+            return None
+        session = SSESession(secrets.token_urlsafe(16), self.queue_size, owner)
+        self._sessions[session.session_id] = session
+        if self.shared:
+            # Registered before the client learns the session ID, so that its
+            # first message can be routed by any worker
+            try:
+                await asyncio.to_thread(shared_state.register_session, session.session_id, worker_id())
+            except Exception as e:
+                logger.warning(f"Failed to register SSE session in shared state: {e}")
+        logger.info(f"SSE session {session.session_id} opened ({len(self._sessions)} open)")
+        return session
     
-    return json.dumps({
-        "success": True,
-        "sites": sites_list,
-        "default_site": DEFAULT_SITE,
-        "count": len(sites_list),
-        "user_connections_count": sum(1 for s in sites_list if s.get("user_connection"))
-    }, ensure_ascii=False)
+    def get(self, session_id: Optional[str]) -> Optional[SSESession]:
+        """Get an open session by ID"""
+        return self._sessions.get(session_id) if session_id else None
+    
+    def close(self, session: SSESession):
+        """Close a session and cancel its running requests"""
+        if self._sessions.pop(session.session_id, None) is None:
+            return
+        session.closed = True
+        for task in session.tasks.values():
+            task.cancel()
+        # Wake up the stream; if the queue is full the stream is dropped anyway
+        try:
+            session.queue.put_nowait(self._CLOSE)
+        except asyncio.QueueFull:
+            pass
+        if self.shared:
+            task = asyncio.create_task(self._unregister(session.session_id))
+            self._unregistering.add(task)
+            task.add_done_callback(self._unregistering.discard)
+        logger.info(f"SSE session {session.session_id} closed ({len(self._sessions)} open)")
+    
+    async def _unregister(self, session_id: str):
+        """Remove a closed session from shared state"""
+        try:
+            await asyncio.to_thread(shared_state.unregister_session, session_id)
+        except Exception as e:
+            logger.warning(f"Failed to unregister SSE session from shared state: {e}")
+    
+    async def events(self, session: SSESession, first_events: List[ServerSentEvent]) -> AsyncIterator[ServerSentEvent]:
+        """
+        Stream events of a session until it is closed or the client disconnects
+        
+        Args:
+            session: Session to stream
+            first_events: Events sent right after opening
+        
+        Yields:
+            SSE events
+        """
+        try:
+            for event in first_events:
+                yield event
+            while not session.closed:
+                event = await session.queue.get()
+                if event is self._CLOSE:
+                    break
+                yield event
+        finally:
+            self.close(session)
+    
+    def dispatch(self, session: SSESession, data: Any):
+        """
+        Handle a message POSTed to a session in the background
+        
+        A notifications/cancelled message cancels the running request it names.
+        A request reusing the id of a running request, or with an id that is
+        not a string or integer, is answered with an Invalid Request error
+        (cancellation would be ambiguous).
+        
+        Args:
+            session: Target session
+            data: Decoded JSON-RPC message or batch
+        """
+        if isinstance(data, dict) and data.get("method") == "notifications/cancelled":
+            params = data.get("params")
+            request_id = params.get("requestId") if isinstance(params, dict) else None
+            task = session.tasks.get(request_id) if _valid_request_id(request_id) else None
+            if task is not None:
+                task.cancel()
+            return
+        
+        key = data.get("id") if isinstance(data, dict) and data.get("id") is not None else object()
+        if isinstance(data, dict) and data.get("id") is not None and not _valid_request_id(key):
+            self._reject(session, None, -32600, "Invalid Request: id must be a string or an integer")
+            return
+        if key in session.tasks:
+            self._reject(session, key, -32600, f"Invalid Request: request {key!r} is already running")
+            return
+        
+        async def run():
+            try:
+                async for event in stream_jsonrpc(data, caller=session.owner):
+                    await session.send(event)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"SSE session {session.session_id} request failed: {e}")
+            finally:
+                session.tasks.pop(key, None)
+        
+        session.tasks[key] = asyncio.create_task(run())
+    
+    def _reject(self, session: SSESession, request_id: Any, code: int, message: str):
+        """Send a JSON-RPC error for a request that is not run (dropped if the queue is full)"""
+        try:
+            session.queue.put_nowait(ServerSentEvent(
+                data=encode_json({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}),
+                event="message"
+            ))
+        except asyncio.QueueFull:
+            pass
+    
+    async def is_remote(self, session_id: Optional[str]) -> bool:
+        """Check whether another worker holds the stream of a session"""
+        if not (self.shared and session_id) or session_id in self._sessions:
+            return False
+        try:
+            return await asyncio.to_thread(shared_state.session_worker, session_id) is not None
+        except Exception as e:
+            logger.warning(f"Failed to look up SSE session in shared state: {e}")
+            return False
+    
+    async def relay(self, session_id: str, body: bytes):
+        """Queue a message for the worker holding a session (see is_remote)"""
+        await asyncio.to_thread(shared_state.enqueue_message, session_id, body.decode("utf-8"))
+    
+    async def _relay(self):
+        """Dispatch messages other workers received for sessions of this worker"""
+        while True:
+            await asyncio.sleep(self.relay_interval)
+            try:
+                messages = await asyncio.to_thread(shared_state.take_messages, worker_id())
+            except Exception as e:
+                logger.warning(f"Failed to read relayed SSE messages: {e}")
+                continue
+            for session_id, payload in messages:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    continue
+                try:
+                    data = json.loads(payload)
+                    session.touch()
+                    # Same limits as /sse/messages, which answers 429 instead
+                    if session.is_full() or len(session.tasks) >= self.queue_size:
+                        logger.warning(f"SSE session {session_id} is busy, refusing relayed message")
+                        if isinstance(data, dict) and data.get("id") is not None:
+                            self._reject(session, data["id"], -32000, "SSE session is busy, retry later")
+                        continue
+                    self.dispatch(session, data)
+                except Exception as e:
+                    logger.error(f"Failed to handle relayed message for SSE session {session_id}: {e}")
+    
+    def tick(self, now: Optional[float] = None):
+        """Send heartbeats and close idle sessions (cancelling their running requests)"""
+        now = time.monotonic() if now is None else now
+        heartbeat = ServerSentEvent(data="ping", event="ping")
+        for session in list(self._sessions.values()):
+            if now - session.last_activity > self.idle_timeout:
+                logger.info(
+                    f"SSE session {session.session_id} idle, closing "
+                    f"({len(session.tasks)} running requests cancelled)"
+                )
+                self.close(session)
+            elif not session.is_full():
+                session.queue.put_nowait(heartbeat)
+    
+    async def _run(self):
+        """Shared heartbeat timer"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.tick()
+            if self.shared:
+                # Keeps our sessions registered, drops those of workers that died
+                try:
+                    await asyncio.to_thread(
+                        shared_state.heartbeat_sessions, worker_id(), self.heartbeat_interval * 4
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to refresh SSE sessions in shared state: {e}")
+    
+    def start(self):
+        """Start the heartbeat timer (and the relay of messages from other workers)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self.shared and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+    
+    async def stop(self):
+        """Stop the heartbeat timer and close all sessions"""
+        for task in (self._task, self._relay_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._relay_task = None
+        for session in list(self._sessions.values()):
+            self.close(session)
+        await asyncio.gather(*self._unregistering, return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get session counts and queued events"""
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "queued_events": sum(session.queue.qsize() for session in self._sessions.values()),
+            "running_requests": sum(len(session.tasks) for session in self._sessions.values())
+        }
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+sse_sessions = SSESessionManager(
+    MCP_SSE_MAX_SESSIONS,
+    MCP_SSE_SESSION_IDLE_TIMEOUT,
+    MCP_SSE_HEARTBEAT_INTERVAL,
+    MCP_SSE_SESSION_QUEUE_SIZE,
+    MCP_SHARED_STATE,
+    MCP_RELAY_POLL_INTERVAL
+)
+
+
+def _upstream_in_flight() -> Dict[Tuple[str, ...], float]:
+    """In-flight WordPress requests per host"""
+    in_flight: Dict[Tuple[str, ...], float] = {}
+    clients = wp_clients.clients()
+    if wp_client_instance is not None:
+        clients.append(wp_client_instance)
+    for client in clients:
+        in_flight[(client.host,)] = in_flight.get((client.host,), 0) + client.in_flight
+    return in_flight
+
+
+def _read_timeouts() -> Dict[Tuple[str, ...], float]:
+    """Current adaptive read timeout per site REST API URL and request kind"""
+    return {
+        (url, kind): latency.read_timeout(kind)
+        for url, latency in list(_site_latencies.items())
+        for kind in SiteLatency.KINDS
+    }
+
+
+def _circuit_states() -> Dict[Tuple[str, ...], float]:
+    """Circuit breaker state per site REST API URL"""
+    return {(url,): CIRCUIT_STATE_VALUES[breaker.state] for url, breaker in list(_circuit_breakers.items())}
+
+
+metrics.REGISTRY.gauge("wp_client_pool_clients", "Pooled WordPress clients").set_function(
+    lambda: {(): len(wp_clients)}
+)
+metrics.REGISTRY.gauge("wp_client_pool_max_clients", "WordPress client pool size limit").set_function(
+    lambda: {(): wp_clients.max_size}
+)
+metrics.REGISTRY.gauge("wp_upstream_in_flight", "In-flight WordPress requests", ("host",)).set_function(
+    _upstream_in_flight
+)
+metrics.REGISTRY.gauge(
+    "wp_circuit_breaker_state", "Circuit breaker state per site (0 closed, 1 half-open, 2 open)", ("url",)
+).set_function(_circuit_states)
+metrics.REGISTRY.gauge(
+    "wp_read_timeout_seconds", "Adaptive read timeout per site and request kind", ("url", "kind")
+).set_function(_read_timeouts)
+metrics.REGISTRY.gauge(
+    "wp_distinct_gets_in_flight", "Distinct in-flight WordPress GETs (identical GETs share one)"
+).set_function(lambda: {(): len(_get_flights)})
+metrics.REGISTRY.gauge("mcp_sse_sessions", "Open SSE sessions").set_function(
+    lambda: {(): len(sse_sessions)}
+)
+metrics.REGISTRY.gauge("mcp_sse_queued_events", "Events queued for SSE sessions").set_function(
+    lambda: {(): sse_sessions.stats()["queued_events"]}
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks"""
+    last_used_buffer.start()
+    post_mirror_sync.start()
+    sse_sessions.start()
+    try:
+        # Task group of the /mcp Streamable HTTP sessions
+        async with mcp.session_manager.run():
+            yield
+    finally:
+        await sse_sessions.stop()
+        await post_mirror_sync.stop()
+        await last_used_buffer.stop()
+        await wp_clients.close_all()
+        await close_shared_http_client()
 
 
 # Create FastAPI app for additional endpoints (health check, info)
 app = FastAPI(
     title="WordPress MCP Server",
     description="MCP Server for managing WordPress posts via ChatGPT",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -605,6 +3228,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request timing of MCP transports (enabled per request by MCP_TIMING_HEADER)
+request_timings: deque = deque(maxlen=MCP_TIMING_MAX_ENTRIES)
+app.add_middleware(
+    profiling.RequestTimingMiddleware,
+    prefixes=("/sse", "/mcp"),
+    header=MCP_TIMING_HEADER,
+    token=MCP_ADMIN_TOKEN,
+    timings=request_timings
+)
+
+sampling_profiler = profiling.SamplingProfiler()
+
+
+# ========================================
+# STREAMABLE HTTP TRANSPORT (/mcp)
+# ========================================
+
+# The FastMCP routes are added to this app rather than mounting the FastMCP
+# Starlette app, so CORS and request timing apply to /mcp as well.
+# streamable_http_app() creates the session manager that lifespan runs, so it
+# has to be called here, before the app starts.
+app.router.routes.extend(mcp.streamable_http_app().routes)
+
 
 @app.get("/")
 async def root():
@@ -647,200 +3293,485 @@ async def health():
     return {
         "status": "healthy",
         "service": "wordpress-mcp-server",
-        "wordpress_configured": wp_client_instance is not None
+        "wordpress_configured": wp_client_instance is not None,
+        "sse": sse_sessions.stats(),
+        "unavailable_sites": [url for url, breaker in _circuit_breakers.items() if breaker.state != CircuitBreaker.CLOSED],
+        "worker": worker_id(),
+        "workers": MCP_WORKERS
     }
 
 
+# ========================================
+# ADMIN: PROFILING
+# ========================================
+
+def require_admin(request: Request):
+    """Check the admin token (Authorization: Bearer ... or X-Admin-Token)"""
+    if not MCP_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        token = authorization[len("Bearer "):]
+    else:
+        token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), MCP_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+# Metric labels name the sites of all users, so /metrics is an admin endpoint too
+# (scrape with Authorization: Bearer <MCP_ADMIN_TOKEN>; disabled without a token)
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.post("/admin/profile/start", dependencies=[Depends(require_admin)])
+async def admin_profile_start(seconds: float = 30, interval: float = 0.005):
+    """Start the sampling profiler in the background for N seconds"""
+    if not sampling_profiler.start(seconds, interval):
+        return JSONResponse({"success": False, "message": "Profiler is already running"}, status_code=409)
+    return {"success": True, "profile": sampling_profiler.status()}
+
+
+@app.post("/admin/profile/stop", dependencies=[Depends(require_admin)])
+async def admin_profile_stop():
+    """Stop the sampling profiler and return the collapsed stacks"""
+    await asyncio.to_thread(sampling_profiler.stop)
+    return PlainTextResponse(sampling_profiler.collapsed())
+
+
+@app.get("/admin/profile/status", dependencies=[Depends(require_admin)])
+async def admin_profile_status():
+    """Sampling profiler state"""
+    return sampling_profiler.status()
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 10, interval: float = 0.005):
+    """
+    Profile for N seconds and return the collapsed stacks
+    
+    The output (one "stack count" line per stack) can be fed to
+    flamegraph.pl, speedscope or inferno.
+    """
+    if not sampling_profiler.start(seconds, interval):
+        return JSONResponse({"success": False, "message": "Profiler is already running"}, status_code=409)
+    while sampling_profiler.running:
+        await asyncio.sleep(0.1)
+    return PlainTextResponse(sampling_profiler.collapsed())
+
+
+@app.post("/admin/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc_start(frames: int = 1):
+    """Start allocation tracing (costs memory and CPU until stopped)"""
+    return {"success": True, "started": profiling.start_tracemalloc(frames)}
+
+
+@app.post("/admin/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc_stop():
+    """Stop allocation tracing"""
+    return {"success": True, "stopped": profiling.stop_tracemalloc()}
+
+
+@app.get("/admin/tracemalloc", dependencies=[Depends(require_admin)])
+async def admin_tracemalloc(limit: int = 25, group_by: str = "lineno"):
+    """Top allocators of the current tracemalloc snapshot"""
+    try:
+        return dict(await asyncio.to_thread(profiling.top_allocations, limit, group_by), success=True)
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=409)
+
+
+@app.get("/admin/timings", dependencies=[Depends(require_admin)])
+async def admin_timings(limit: int = 100):
+    """Recent timed /sse and /mcp requests, newest last"""
+    timings = list(request_timings)[-max(limit, 1):]
+    return {"success": True, "timings": timings, "count": len(timings)}
+
+
 @app.get("/msp")
 async def msp_redirect():
     """Redirect /msp to /mcp (common typo)"""
     return RedirectResponse(url="/mcp", status_code=301)
 
 
+# ========================================
+# JSON-RPC HANDLING FOR /sse
+# ========================================
+
+# Fixed choices of tool parameters (site IDs are not listed here: which sites a
+# caller may use differs per user, list_sites returns them)
+TOOL_PARAM_ENUMS = {
+    "fields": list(POST_FIELDS),
+    "source": ["auto", "mirror", "origin"]
+}
+
+_DOC_ARG_RE = re.compile(r"^    (\w+): (.*)$")
+
+
+def parse_tool_docstring(doc: Optional[str]) -> Tuple[str, Dict[str, str]]:
+    """
+    Split a tool docstring into its description and argument descriptions
+    
+    Args:
+        doc: Google-style docstring
+    
+    Returns:
+        Tuple of description and dict mapping argument name to description
+    """
+    description: List[str] = []
+    args: Dict[str, str] = {}
+    section = None
+    current = None
+    for line in inspect.cleandoc(doc or "").splitlines():
+        stripped = line.strip()
+        if stripped.endswith(":") and not line.startswith(" "):
+            section = stripped
+            current = None
+        elif section is None:
+            if stripped:
+                description.append(stripped)
+        elif section == "Args:":
+            match = _DOC_ARG_RE.match(line)
+            if match:
+                current = match.group(1)
+                args[current] = match.group(2)
+            elif current and stripped:
+                args[current] += " " + stripped
+    return " ".join(description), args
+
+
+def clean_tool_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop generated titles, null defaults and Optional null branches from a JSON schema"""
+    any_of = schema.get("anyOf")
+    if any_of and len(any_of) == 2 and {"type": "null"} in any_of:
+        not_null = next(option for option in any_of if option != {"type": "null"})
+        schema = dict(not_null, **{key: value for key, value in schema.items() if key != "anyOf"})
+    
+    cleaned = {}
+    for key, value in schema.items():
+        if key == "title" or (key == "default" and value is None):
+            continue
+        if key == "properties":
+            value = {name: clean_tool_schema(prop) for name, prop in value.items()}
+        elif key == "items" and isinstance(value, dict):
+            value = clean_tool_schema(value)
+        cleaned[key] = value
+    return cleaned
+
+
+class ToolsListCache:
+    """
+    Encoded tools/list result built from the FastMCP tool registry
+    
+    The result is serialized once and rebuilt only when the registered tools
+    change. It is the same for every caller, so it names no sites.
+    """
+    
+    def __init__(self, server: FastMCP):
+        """
+        Initialize tools/list cache
+        
+        Args:
+            server: FastMCP server whose tools are listed
+        """
+        self.server = server
+        self._key: Any = None
+        self._encoded: Optional[str] = None
+    
+    def _tool_entry(self, tool) -> Dict[str, Any]:
+        """Build tools/list entry of one tool"""
+        description, arg_descriptions = parse_tool_docstring(tool.description)
+        schema = clean_tool_schema(tool.inputSchema)
+        for name, prop in schema.get("properties", {}).items():
+            if name in arg_descriptions:
+                prop["description"] = arg_descriptions[name]
+            if name == "site":
+                prop["description"] = f"{prop.get('description', 'Site ID')} Default site: {DEFAULT_SITE}."
+            elif name in TOOL_PARAM_ENUMS:
+                target = prop["items"] if prop.get("type") == "array" else prop
+                target["enum"] = TOOL_PARAM_ENUMS[name]
+        return {"name": tool.name, "description": description, "inputSchema": schema}
+    
+    async def get(self) -> str:
+        """Get encoded tools/list result, rebuilding it if the tools have changed"""
+        tools = await self.server.list_tools()
+        key = tuple(tool.name for tool in tools)
+        if key != self._key:
+            entries = [self._tool_entry(tool) for tool in tools]
+            self._encoded = encode_json({"tools": entries})
+            self._key = key
+            logger.info(f"Built tools/list with {len(entries)} tools")
+        return self._encoded
+
+
+tools_list_cache = ToolsListCache(mcp)
+
+
+def encode_json(value: Any) -> str:
+    """Encode a JSON-RPC message or tool result as compact JSON (orjson if installed)"""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_jsonrpc_result(request_id: Any, encoded_result: str) -> str:
+    """Wrap an already encoded result into a JSON-RPC response"""
+    return f'{{"jsonrpc":"2.0","id":{encode_json(request_id)},"result":{encoded_result}}}'
+
+
+async def handle_jsonrpc_message(data: Any) -> Optional[str]:
+    """
+    Handle one JSON-RPC message received on /sse
+    
+    Args:
+        data: Decoded JSON-RPC request
+    
+    Returns:
+        Encoded JSON-RPC response, or None if the message needs no response
+    """
+    if not isinstance(data, dict):
+        return encode_json({
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32600, "message": "Invalid Request"}
+        })
+    
+    logger.info(f"MCP Request: {data}")
+    response = None
+    
+    # Handle MCP initialize
+    if data.get("method") == "initialize":
+        response = {
+            "jsonrpc": "2.0",
+            "id": data.get("id"),
+            "result": {
+                "protocolVersion": "2024-11-05",
+                "serverInfo": {
+                    "name": "WordPress MCP Server",
+                    "version": "1.0.0"
+                },
+                "capabilities": {
+                    "tools": {}
+                }
+            }
+        }
+    
+    # Handle tools/list
+    elif data.get("method") == "tools/list":
+        return encode_jsonrpc_result(data.get("id"), await tools_list_cache.get())
+    
+    # Handle tools/call
+    elif data.get("method") == "tools/call":
+        tool_name = data.get("params", {}).get("name")
+        arguments = data.get("params", {}).get("arguments", {})
+        
+        # Map tool calls to MCP tool functions (which support site parameter)
+        tools_map = {
+            "create_post": create_post,
+            "update_post": update_post,
+            "get_posts": get_posts,
+            "search_posts": search_posts,
+            "delete_post": delete_post,
+            "bulk_create_posts": bulk_create_posts,
+            "publish_to_sites": publish_to_sites,
+            "list_sites": list_sites
+        }
+        
+        if tool_name in tools_map:
+            try:
+                # Call the MCP tool function directly, with progress going to the SSE stream
+                meta = data.get("params", {}).get("_meta") or {}
+                token = _progress_token.set(meta.get("progressToken"))
+                try:
+                    result = await tools_map[tool_name](**arguments)
+                finally:
+                    _progress_token.reset(token)
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": data.get("id"),
+                    "result": {
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": encode_json(result)
+                            }
+                        ]
+                    }
+                }
+            except Exception as e:
+                logger.error(f"Tool execution error: {e}")
+                response = {
+                    "jsonrpc": "2.0",
+                    "id": data.get("id"),
+                    "error": {
+                        "code": -32603,
+                        "message": str(e)
+                    }
+                }
+        else:
+            response = {
+                "jsonrpc": "2.0",
+                "id": data.get("id"),
+                "error": {
+                    "code": -32601,
+                    "message": f"Tool not found: {tool_name}"
+                }
+            }
+    
+    # Handle ping
+    elif data.get("method") == "ping":
+        response = {"jsonrpc": "2.0", "id": data.get("id"), "result": {}}
+    
+    # Unknown request (notifications get no response)
+    elif data.get("id") is not None:
+        if isinstance(data.get("method"), str):
+            error = {"code": -32601, "message": f"Method not found: {data['method']}"}
+        else:
+            error = {"code": -32600, "message": "Invalid Request"}
+        response = {"jsonrpc": "2.0", "id": data.get("id"), "error": error}
+    
+    return encode_json(response) if response is not None else None
+
+
+async def handle_jsonrpc_batch(batch: List[Any], as_array: bool = False) -> AsyncIterator[ServerSentEvent]:
+    """
+    Handle a JSON-RPC 2.0 batch received on /sse
+    
+    All requests of the batch run concurrently. Responses are sent as SSE
+    events in completion order, or as one event holding the response array
+    (in request order) if as_array is set. Notifications get no response.
+    
+    Args:
+        batch: List of JSON-RPC requests
+        as_array: Send all responses as one JSON array
+    
+    Yields:
+        SSE message events
+    """
+    if not batch:
+        response = {
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {"code": -32600, "message": "Invalid Request: empty batch"}
+        }
+        yield ServerSentEvent(data=encode_json(response), event="message")
+        return
+    
+    logger.info(f"MCP batch of {len(batch)} requests")
+    
+    if as_array:
+        responses = await asyncio.gather(*(handle_jsonrpc_message(data) for data in batch))
+        responses = [response for response in responses if response is not None]
+        if responses:
+            yield ServerSentEvent(data="[" + ",".join(responses) + "]", event="message")
+        return
+    
+    tasks = [asyncio.create_task(handle_jsonrpc_message(data)) for data in batch]
+    try:
+        for task in asyncio.as_completed(tasks):
+            response = await task
+            if response is not None:
+                yield ServerSentEvent(data=response, event="message")
+    finally:
+        # Client went away before the batch finished
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_jsonrpc(
+    data: Any,
+    as_array: bool = False,
+    caller: Optional[str] = None
+) -> AsyncIterator[ServerSentEvent]:
+    """
+    Handle a JSON-RPC message or batch, streaming notifications sent on the way
+    
+    Progress notifications of running tool calls are yielded as soon as they
+    are reported, responses when they are ready. Pending calls are cancelled
+    if the client disconnects. While MCP_SSE_SESSION_QUEUE_SIZE events wait
+    for a slow client, further notifications are dropped; responses never are.
+    
+    Args:
+        data: Decoded JSON-RPC request or batch
+        as_array: Send batch responses as one JSON array
+        caller: Username the request acts for (see current_caller)
+    
+    Yields:
+        SSE message events
+    """
+    # Holds at most MCP_SSE_SESSION_QUEUE_SIZE notifications plus one
+    # response per request, which always get in
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    dropped = 0
+    
+    def notify(message: str):
+        nonlocal dropped
+        if queue.qsize() >= MCP_SSE_SESSION_QUEUE_SIZE:
+            dropped += 1
+            return
+        queue.put_nowait(message)
+    
+    async def handle():
+        _notification_sink.set(notify)
+        _caller.set(caller)
+        try:
+            if isinstance(data, list):
+                async for event in handle_jsonrpc_batch(data, as_array):
+                    queue.put_nowait(event)
+            else:
+                response = await handle_jsonrpc_message(data)
+                if response is not None:
+                    queue.put_nowait(response)
+        finally:
+            queue.put_nowait(finished)
+    
+    task = asyncio.create_task(handle())
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            yield item if isinstance(item, ServerSentEvent) else ServerSentEvent(data=item, event="message")
+        await task
+    finally:
+        task.cancel()
+        if dropped:
+            logger.warning(f"Dropped {dropped} progress notifications for a slow /sse client")
+
+
 # Create proper MCP SSE endpoint that handles the MCP protocol
 @app.api_route("/sse", methods=["GET", "POST", "OPTIONS"])
 async def sse_endpoint(request: Request):
     """
     SSE endpoint for MCP protocol
     Handles ChatGPT MCP connections via Server-Sent Events
+    
+    GET (or an empty POST) opens a session: the first "endpoint" event gives
+    the URL to POST messages to, responses arrive on the stream.
+    
+    A POST body may be a JSON-RPC batch (array). Its responses are streamed
+    as they complete, or sent as one array with ?batch=array. Tool calls with
+    a progressToken in params._meta stream notifications/progress and
+    notifications/partial_result events before their response.
     """
     logger.info(f"SSE request: {request.method} from {request.client}")
     
-    async def event_generator():
-        """Generate SSE events for MCP protocol"""
-        try:
-            # Read request body if POST
-            if request.method == "POST":
-                try:
-                    body = await request.body()
-                    if body:
-                        data = json.loads(body)
-                        logger.info(f"MCP Request: {data}")
-                        
-                        # Handle MCP initialize
-                        if data.get("method") == "initialize":
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": data.get("id"),
-                                "result": {
-                                    "protocolVersion": "2024-11-05",
-                                    "serverInfo": {
-                                        "name": "WordPress MCP Server",
-                                        "version": "1.0.0"
-                                    },
-                                    "capabilities": {
-                                        "tools": {}
-                                    }
-                                }
-                            }
-                            yield ServerSentEvent(
-                                data=json.dumps(response),
-                                event="message"
-                            )
-                        
-                        # Handle tools/list
-                        elif data.get("method") == "tools/list":
-                            tools_list = [
-                                {
-                                    "name": "create_post",
-                                    "description": "Create a new WordPress post. You can specify which site to post to using the 'site' parameter. Available sites: thamini (Тхамини Джйотиш, Украина), dharana (Дхарна Джйотиш, Русский), step (Степ - Make Автоматизация, Украина), makego (MakeGo - Автоматизация СНГ, Русский), yogasystem (Yoga System, Русский), yogaua (YogaUA, Украина). If 'site' is not specified, posts to default site (thamini).",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "title": {"type": "string"},
-                                            "content": {"type": "string"},
-                                            "status": {"type": "string", "enum": ["publish", "draft"]},
-                                            "site": {"type": "string", "enum": ["thamini", "dharana", "step", "makego", "yogasystem", "yogaua"], "description": "Site ID to post to (optional)"}
-                                        },
-                                        "required": ["title", "content"]
-                                    }
-                                },
-                                {
-                                    "name": "update_post",
-                                    "description": "Update an existing WordPress post. Specify 'site' parameter to indicate which site the post is on.",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "post_id": {"type": "integer"},
-                                            "title": {"type": "string"},
-                                            "content": {"type": "string"},
-                                            "status": {"type": "string"},
-                                            "site": {"type": "string", "enum": ["thamini", "dharana", "step", "makego", "yogasystem", "yogaua"], "description": "Site ID where the post is located (optional)"}
-                                        },
-                                        "required": ["post_id"]
-                                    }
-                                },
-                                {
-                                    "name": "get_posts",
-                                    "description": "Get list of WordPress posts. Specify 'site' parameter to get posts from a specific site.",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "per_page": {"type": "integer", "default": 10},
-                                            "page": {"type": "integer", "default": 1},
-                                            "status": {"type": "string"},
-                                            "site": {"type": "string", "enum": ["thamini", "dharana", "step", "makego", "yogasystem", "yogaua"], "description": "Site ID to get posts from (optional)"}
-                                        }
-                                    }
-                                },
-                                {
-                                    "name": "delete_post",
-                                    "description": "Delete a WordPress post. Specify 'site' parameter to indicate which site the post is on.",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {
-                                            "post_id": {"type": "integer"},
-                                            "site": {"type": "string", "enum": ["thamini", "dharana", "step", "makego", "yogasystem", "yogaua"], "description": "Site ID where the post is located (optional)"}
-                                        },
-                                        "required": ["post_id"]
-                                    }
-                                },
-                                {
-                                    "name": "list_sites",
-                                    "description": "Get list of all available WordPress sites with their IDs, names, URLs, and languages",
-                                    "inputSchema": {
-                                        "type": "object",
-                                        "properties": {}
-                                    }
-                                }
-                            ]
-                            
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": data.get("id"),
-                                "result": {
-                                    "tools": tools_list
-                                }
-                            }
-                            yield ServerSentEvent(
-                                data=json.dumps(response),
-                                event="message"
-                            )
-                        
-                        # Handle tools/call
-                        elif data.get("method") == "tools/call":
-                            tool_name = data.get("params", {}).get("name")
-                            arguments = data.get("params", {}).get("arguments", {})
-                            
-                            # Map tool calls to MCP tool functions (which support site parameter)
-                            tools_map = {
-                                "create_post": create_post,
-                                "update_post": update_post,
-                                "get_posts": get_posts,
-                                "delete_post": delete_post,
-                                "list_sites": list_sites
-                            }
-                            
-                            if tool_name in tools_map:
-                                try:
-                                    # Call the MCP tool function directly
-                                    result_str = await tools_map[tool_name](**arguments)
-                                    # Parse JSON result
-                                    result = json.loads(result_str)
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": data.get("id"),
-                                        "result": {
-                                            "content": [
-                                                {
-                                                    "type": "text",
-                                                    "text": json.dumps(result, ensure_ascii=False, indent=2)
-                                                }
-                                            ]
-                                        }
-                                    }
-                                except Exception as e:
-                                    logger.error(f"Tool execution error: {e}")
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": data.get("id"),
-                                        "error": {
-                                            "code": -32603,
-                                            "message": str(e)
-                                        }
-                                    }
-                            else:
-                                response = {
-                                    "jsonrpc": "2.0",
-                                    "id": data.get("id"),
-                                    "error": {
-                                        "code": -32601,
-                                        "message": f"Tool not found: {tool_name}"
-                                    }
-                                }
-                            
-                            yield ServerSentEvent(
-                                data=json.dumps(response),
-                                event="message"
-                            )
-                        
-                        return
-                        
-                except json.JSONDecodeError:
-                    logger.warning("Invalid JSON in request body")
-            
-            # For GET or empty POST, send server info
-            yield ServerSentEvent(
+    if request.method == "OPTIONS":
+        return Response(status_code=204)
+    
+    body = await request.body() if request.method == "POST" else b""
+    
+    # GET or empty POST opens a session stream
+    if not body:
+        session = await sse_sessions.open(request_caller(request))
+        if session is None:
+            return JSONResponse({"error": "Too many open SSE sessions"}, status_code=503)
+        first_events = [
+            ServerSentEvent(data=f"/sse/messages?session_id={session.session_id}", event="endpoint"),
+            ServerSentEvent(
                 data=json.dumps({
                     "jsonrpc": "2.0",
                     "method": "server/info",
@@ -852,11 +3783,29 @@ async def sse_endpoint(request: Request):
                 }),
                 event="message"
             )
+        ]
+        # Heartbeats come from sse_sessions, the library ping is only a fallback
+        return EventSourceResponse(
+            sse_sessions.events(session, first_events),
+            ping=SSE_LIBRARY_PING_INTERVAL
+        )
+    
+    async def event_generator():
+        """Generate SSE events for MCP protocol"""
+        try:
+            try:
+                data = json.loads(body)
+            except json.JSONDecodeError:
+                logger.warning("Invalid JSON in request body")
+                yield ServerSentEvent(
+                    data=encode_json({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}),
+                    event="message"
+                )
+                return
             
-            # Keep connection alive with periodic pings
-            while True:
-                await asyncio.sleep(30)
-                yield ServerSentEvent(data="ping", event="ping")
+            as_array = request.query_params.get("batch") == "array"
+            async for event in stream_jsonrpc(data, as_array, request_caller(request)):
+                yield event
                 
         except Exception as e:
             logger.error(f"SSE error: {e}")
@@ -867,6 +3816,43 @@ async def sse_endpoint(request: Request):
     
     return EventSourceResponse(event_generator())
 
+
+@app.post("/sse/messages")
+async def sse_session_message(request: Request):
+    """
+    Receive a JSON-RPC message for an open SSE session
+    
+    The response is sent on the session stream; this request only returns
+    202 Accepted (404 for unknown sessions, 429 if the session is not
+    reading its events or has too many running requests). Messages for a
+    session held by another worker are relayed to it.
+    """
+    session_id = request.query_params.get("session_id")
+    session = sse_sessions.get(session_id)
+    if session is None and not await sse_sessions.is_remote(session_id):
+        return JSONResponse({"error": "Unknown or expired SSE session"}, status_code=404)
+    
+    body = await request.body()
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        return JSONResponse(
+            {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}},
+            status_code=400
+        )
+    
+    if session is None:
+        await sse_sessions.relay(session_id, body)
+        return Response(status_code=202)
+    
+    session.touch()
+    if session.is_full() or len(session.tasks) >= sse_sessions.queue_size:
+        return JSONResponse({"error": "SSE session is busy, retry later"}, status_code=429)
+    
+    sse_sessions.dispatch(session, data)
+    return Response(status_code=202)
+
+
 # Add GET endpoint for MCP info at /mcp-info (to avoid conflicts with /mcp mount)
 @app.get("/mcp-info", response_class=HTMLResponse)
 async def mcp_info_get():
@@ -1226,9 +4212,20 @@ if __name__ == "__main__":
     logger.info("Streamable HTTP endpoint: http://localhost:8000/mcp")
     logger.info("Production URL: https://mcp.2msp.online")
     
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info"
-    )
+    if MCP_WORKERS > 1:
+        # Workers import the app themselves, so it is passed by name
+        logger.info(f"Starting {MCP_WORKERS} worker processes")
+        uvicorn.run(
+            "mcp_sse_server:app",
+            host="0.0.0.0",
+            port=8000,
+            log_level="info",
+            workers=MCP_WORKERS
+        )
+    else:
+        uvicorn.run(
+            app,
+            host="0.0.0.0",
+            port=8000,
+            log_level="info"
+        )
@@ -2,8 +2,12 @@
 """
 Persistent storage for user service connections (Kie.ai, Wordstat, Telegram Bot, etc.)
 Stores API keys and credentials for various services
+
+Writes replace the file atomically and hold an exclusive lock on a
+sidecar .lock file, so several server workers can share the store.
 """
 
+import functools
 import json
 import logging
 from datetime import datetime
@@ -12,6 +16,11 @@ from typing import Dict, List, Optional
 from cryptography.fernet import Fernet
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 # Storage file
@@ -45,16 +54,34 @@ def _load_connections() -> Dict:
 
 
 def _save_connections(connections: Dict) -> bool:
-    """Save connections to file"""
+    """Save connections to file (readers see either the old or the new file)"""
+    temp_file = CONNECTIONS_FILE.with_name(f"{CONNECTIONS_FILE.name}.{os.getpid()}.tmp")
     try:
-        with open(CONNECTIONS_FILE, 'w', encoding='utf-8') as f:
+        with open(temp_file, 'w', encoding='utf-8') as f:
             json.dump(connections, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, CONNECTIONS_FILE)
         return True
     except Exception as e:
         logger.error(f"Error saving connections: {e}")
+        temp_file.unlink(missing_ok=True)
         return False
 
 
+def _exclusive(func):
+    """Run a load-modify-save function while holding the store's file lock"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if fcntl is None:
+            return func(*args, **kwargs)
+        with open(CONNECTIONS_FILE.with_name(CONNECTIONS_FILE.name + ".lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return wrapper
+
+
 def _encrypt(value: str) -> str:
     """Encrypt value"""
     if not value:
@@ -73,6 +100,7 @@ def _decrypt(encrypted: str) -> str:
 # Kie.ai Connections
 # ============================================
 
+@_exclusive
 def add_kie_connection(
     username: str,
     connection_name: str,
@@ -121,6 +149,7 @@ def get_kie_connections(username: str) -> List[Dict]:
     return result
 
 
+@_exclusive
 def update_kie_connection(
     username: str,
     connection_id: str,
@@ -151,6 +180,7 @@ def update_kie_connection(
     return _save_connections(connections)
 
 
+@_exclusive
 def delete_kie_connection(username: str, connection_id: str) -> bool:
     """Delete Kie.ai connection"""
     connections = _load_connections()
@@ -166,6 +196,7 @@ def delete_kie_connection(username: str, connection_id: str) -> bool:
 # Wordstat Connections
 # ============================================
 
+@_exclusive
 def add_wordstat_connection(
     username: str,
     connection_name: str,
@@ -218,6 +249,7 @@ def get_wordstat_connections(username: str) -> List[Dict]:
     return result
 
 
+@_exclusive
 def update_wordstat_connection(
     username: str,
     connection_id: str,
@@ -254,6 +286,7 @@ def update_wordstat_connection(
     return _save_connections(connections)
 
 
+@_exclusive
 def delete_wordstat_connection(username: str, connection_id: str) -> bool:
     """Delete Wordstat connection"""
     connections = _load_connections()
@@ -269,6 +302,7 @@ def delete_wordstat_connection(username: str, connection_id: str) -> bool:
 # Telegram Bot Connections
 # ============================================
 
+@_exclusive
 def add_telegram_connection(
     username: str,
     bot_name: str,
@@ -319,6 +353,7 @@ def get_telegram_connections(username: str) -> List[Dict]:
     return result
 
 
+@_exclusive
 def update_telegram_connection(
     username: str,
     connection_id: str,
@@ -352,6 +387,7 @@ def update_telegram_connection(
     return _save_connections(connections)
 
 
+@_exclusive
 def delete_telegram_connection(username: str, connection_id: str) -> bool:
     """Delete Telegram connection"""
     connections = _load_connections()
@@ -2,22 +2,32 @@
 """
 Persistent storage for user WordPress connections
 Stores WordPress site credentials for each user
+
+Connections live in a SQLite database (WAL mode) so that reads and writes
+touch a single row and several processes can use the store at once.
+The legacy JSON file is imported once on first use.
 """
 
 import json
 import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from cryptography.fernet import Fernet
 import os
 
 logger = logging.getLogger(__name__)
 
-# Storage file
+# Legacy JSON storage file (migrated into DATABASE_FILE on first use)
 CONNECTIONS_FILE = Path(__file__).parent / "data" / "wordpress_connections.json"
 CONNECTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
 
+# Storage database
+DATABASE_FILE = Path(__file__).parent / "data" / "wordpress_connections.db"
+
 # Encryption key for passwords (store in environment or generate once)
 ENCRYPTION_KEY = os.environ.get("WP_ENCRYPTION_KEY")
 if not ENCRYPTION_KEY:
@@ -32,28 +42,151 @@ if not ENCRYPTION_KEY:
 
 cipher_suite = Fernet(ENCRYPTION_KEY.encode())
 
+# Columns returned for a connection (owner is stored separately)
+_CONNECTION_FIELDS = (
+    "connection_id",
+    "site_name",
+    "site_url",
+    "wp_username",
+    "wp_password",
+    "site_language",
+    "site_description",
+    "created_at",
+    "updated_at",
+    "enabled",
+    "last_used"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wordpress_connections (
+    owner TEXT NOT NULL,
+    connection_id TEXT NOT NULL,
+    site_name TEXT,
+    site_url TEXT,
+    wp_username TEXT,
+    wp_password TEXT,
+    site_language TEXT,
+    site_description TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    last_used TEXT,
+    PRIMARY KEY (owner, connection_id)
+);
+CREATE INDEX IF NOT EXISTS idx_wordpress_connections_enabled
+    ON wordpress_connections (enabled);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('revision', 0);
+"""
+
+# Schema version stored in PRAGMA user_version
+_SCHEMA_VERSION = 1
 
-def _load_connections() -> Dict:
-    """Load connections from file"""
+# One SQLite connection per thread
+_local = threading.local()
+
+
+def _get_db() -> sqlite3.Connection:
+    """Get SQLite connection for the current thread (initializes the database)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DATABASE_FILE:
+        return conn
+    
+    conn = sqlite3.connect(str(DATABASE_FILE), timeout=30.0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _init_db(conn)
+    
+    _local.conn = conn
+    _local.path = DATABASE_FILE
+    return conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    """Run a write transaction (takes the write lock up front)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _init_db(conn: sqlite3.Connection):
+    """Create schema and migrate the legacy JSON file once"""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    
+    with _transaction(conn):
+        # Another process may have finished initialization meanwhile
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        migrated = _migrate_json_file(conn)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    
+    if migrated:
+        CONNECTIONS_FILE.rename(CONNECTIONS_FILE.with_name(CONNECTIONS_FILE.name + ".migrated"))
+        logger.info(f"Migrated {migrated} WordPress connections from {CONNECTIONS_FILE.name}")
+
+
+def _migrate_json_file(conn: sqlite3.Connection) -> int:
+    """Import connections from the legacy JSON file, returns number of rows"""
     if not CONNECTIONS_FILE.exists():
-        return {}
+        return 0
     try:
         with open(CONNECTIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            connections = json.load(f)
     except Exception as e:
-        logger.error(f"Error loading connections: {e}")
-        return {}
+        logger.error(f"Error loading connections for migration: {e}")
+        return 0
+    
+    rows = []
+    for username, user_connections in connections.items():
+        for conn_id, conn_data in user_connections.items():
+            rows.append((
+                username,
+                conn_data.get("connection_id", conn_id),
+                conn_data.get("site_name"),
+                conn_data.get("site_url"),
+                conn_data.get("wp_username"),
+                conn_data.get("wp_password"),
+                conn_data.get("site_language", "en"),
+                conn_data.get("site_description", ""),
+                conn_data.get("created_at"),
+                conn_data.get("updated_at"),
+                1 if conn_data.get("enabled", True) else 0,
+                conn_data.get("last_used")
+            ))
+    
+    conn.executemany(
+        "INSERT OR IGNORE INTO wordpress_connections (owner, " + ", ".join(_CONNECTION_FIELDS) + ") "
+        "VALUES (" + ", ".join("?" * (len(_CONNECTION_FIELDS) + 1)) + ")",
+        rows
+    )
+    if rows:
+        _bump_revision(conn)
+    return len(rows)
 
 
-def _save_connections(connections: Dict) -> bool:
-    """Save connections to file"""
-    try:
-        with open(CONNECTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(connections, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving connections: {e}")
-        return False
+def _bump_revision(conn: sqlite3.Connection):
+    """Mark stored connections as changed (see get_connections_version)"""
+    conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'revision'")
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict:
+    """Convert database row to connection dict"""
+    conn_data = {field: row[field] for field in _CONNECTION_FIELDS}
+    conn_data["enabled"] = bool(conn_data["enabled"])
+    return conn_data
 
 
 def _encrypt_password(password: str) -> str:
@@ -66,6 +199,40 @@ def _decrypt_password(encrypted: str) -> str:
     return cipher_suite.decrypt(encrypted.encode()).decode()
 
 
+def decrypt_password(encrypted: str) -> str:
+    """
+    Decrypt a stored password
+    
+    Used together with get_all_enabled_connections(decrypt=False) so that
+    callers only pay for decrypting the connections they actually use.
+    
+    Args:
+        encrypted: Encrypted password as stored in the connections database
+    
+    Returns:
+        Plain text password
+    """
+    return _decrypt_password(encrypted)
+
+
+def get_connections_version() -> Optional[int]:
+    """
+    Get a cheap marker that changes whenever the stored connections change
+    
+    The marker is shared by all processes using the database. Updating
+    last_used does not change it.
+    
+    Returns:
+        Revision number of the connections store, or None on error
+    """
+    try:
+        row = _get_db().execute("SELECT value FROM store_meta WHERE key = 'revision'").fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error reading connections version: {e}")
+        return None
+    return row[0] if row else 0
+
+
 def add_wordpress_connection(
     username: str,
     site_name: str,
@@ -90,37 +257,52 @@ def add_wordpress_connection(
     Returns:
         Connection info with connection_id
     """
-    connections = _load_connections()
-    
-    if username not in connections:
-        connections[username] = {}
-    
-    # Generate unique connection ID
-    connection_id = f"{username}_{len(connections[username]) + 1}"
-    
     # Encrypt password
     encrypted_password = _encrypt_password(wp_password)
+    now = datetime.now().isoformat()
     
-    # Store connection
-    connections[username][connection_id] = {
-        "connection_id": connection_id,
-        "site_name": site_name,
-        "site_url": site_url.rstrip('/'),
-        "wp_username": wp_username,
-        "wp_password": encrypted_password,
-        "site_language": site_language,
-        "site_description": site_description,
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
-        "enabled": True,
-        "last_used": None
-    }
-    
-    if _save_connections(connections):
-        logger.info(f"Added WordPress connection '{connection_id}' for user '{username}'")
-        return connections[username][connection_id]
+    try:
+        conn = _get_db()
+        with _transaction(conn):
+            # Generate unique connection ID
+            count = conn.execute(
+                "SELECT COUNT(*) FROM wordpress_connections WHERE owner = ?",
+                (username,)
+            ).fetchone()[0]
+            number = count + 1
+            while conn.execute(
+                "SELECT 1 FROM wordpress_connections WHERE owner = ? AND connection_id = ?",
+                (username, f"{username}_{number}")
+            ).fetchone():
+                number += 1
+            connection_id = f"{username}_{number}"
+            
+            # Store connection
+            connection = {
+                "connection_id": connection_id,
+                "site_name": site_name,
+                "site_url": site_url.rstrip('/'),
+                "wp_username": wp_username,
+                "wp_password": encrypted_password,
+                "site_language": site_language,
+                "site_description": site_description,
+                "created_at": now,
+                "updated_at": now,
+                "enabled": True,
+                "last_used": None
+            }
+            conn.execute(
+                "INSERT INTO wordpress_connections (owner, " + ", ".join(_CONNECTION_FIELDS) + ") "
+                "VALUES (" + ", ".join("?" * (len(_CONNECTION_FIELDS) + 1)) + ")",
+                (username, *(connection[field] for field in _CONNECTION_FIELDS))
+            )
+            _bump_revision(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Error saving connections: {e}")
+        return None
     
-    return None
+    logger.info(f"Added WordPress connection '{connection_id}' for user '{username}'")
+    return connection
 
 
 def get_user_connections(username: str) -> List[Dict]:
@@ -133,16 +315,20 @@ def get_user_connections(username: str) -> List[Dict]:
     Returns:
         List of connection dicts (passwords decrypted)
     """
-    connections = _load_connections()
-    
-    if username not in connections:
+    try:
+        rows = _get_db().execute(
+            "SELECT * FROM wordpress_connections WHERE owner = ? ORDER BY rowid",
+            (username,)
+        ).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error loading connections: {e}")
         return []
     
     result = []
-    for conn_id, conn_data in connections[username].items():
+    for row in rows:
         # Decrypt password
-        conn_copy = conn_data.copy()
-        conn_copy['wp_password'] = _decrypt_password(conn_data['wp_password'])
+        conn_copy = _row_to_dict(row)
+        conn_copy['wp_password'] = _decrypt_password(row['wp_password'])
         result.append(conn_copy)
     
     return result
@@ -159,13 +345,20 @@ def get_connection(username: str, connection_id: str) -> Optional[Dict]:
     Returns:
         Connection dict with decrypted password, or None
     """
-    connections = _load_connections()
+    try:
+        row = _get_db().execute(
+            "SELECT * FROM wordpress_connections WHERE owner = ? AND connection_id = ?",
+            (username, connection_id)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error loading connections: {e}")
+        return None
     
-    if username not in connections or connection_id not in connections[username]:
+    if row is None:
         return None
     
-    conn_data = connections[username][connection_id].copy()
-    conn_data['wp_password'] = _decrypt_password(conn_data['wp_password'])
+    conn_data = _row_to_dict(row)
+    conn_data['wp_password'] = _decrypt_password(row['wp_password'])
     
     return conn_data
 
@@ -192,35 +385,42 @@ def update_connection(
     Returns:
         True if updated successfully
     """
-    connections = _load_connections()
-    
-    if username not in connections or connection_id not in connections[username]:
-        return False
-    
-    conn = connections[username][connection_id]
+    changes = {}
     
     if site_name is not None:
-        conn['site_name'] = site_name
+        changes['site_name'] = site_name
     if site_url is not None:
-        conn['site_url'] = site_url.rstrip('/')
+        changes['site_url'] = site_url.rstrip('/')
     if wp_username is not None:
-        conn['wp_username'] = wp_username
+        changes['wp_username'] = wp_username
     if wp_password is not None:
-        conn['wp_password'] = _encrypt_password(wp_password)
+        changes['wp_password'] = _encrypt_password(wp_password)
     if site_language is not None:
-        conn['site_language'] = site_language
+        changes['site_language'] = site_language
     if site_description is not None:
-        conn['site_description'] = site_description
+        changes['site_description'] = site_description
     if enabled is not None:
-        conn['enabled'] = enabled
+        changes['enabled'] = 1 if enabled else 0
     
-    conn['updated_at'] = datetime.now().isoformat()
+    changes['updated_at'] = datetime.now().isoformat()
     
-    if _save_connections(connections):
-        logger.info(f"Updated connection '{connection_id}' for user '{username}'")
-        return True
+    try:
+        conn = _get_db()
+        with _transaction(conn):
+            cursor = conn.execute(
+                "UPDATE wordpress_connections SET " + ", ".join(f"{field} = ?" for field in changes) +
+                " WHERE owner = ? AND connection_id = ?",
+                (*changes.values(), username, connection_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            _bump_revision(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Error saving connections: {e}")
+        return False
     
-    return False
+    logger.info(f"Updated connection '{connection_id}' for user '{username}'")
+    return True
 
 
 def delete_connection(username: str, connection_id: str) -> bool:
@@ -234,22 +434,22 @@ def delete_connection(username: str, connection_id: str) -> bool:
     Returns:
         True if deleted successfully
     """
-    connections = _load_connections()
-    
-    if username not in connections or connection_id not in connections[username]:
+    try:
+        conn = _get_db()
+        with _transaction(conn):
+            cursor = conn.execute(
+                "DELETE FROM wordpress_connections WHERE owner = ? AND connection_id = ?",
+                (username, connection_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            _bump_revision(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Error saving connections: {e}")
         return False
     
-    del connections[username][connection_id]
-    
-    # Remove user key if no connections left
-    if not connections[username]:
-        del connections[username]
-    
-    if _save_connections(connections):
-        logger.info(f"Deleted connection '{connection_id}' for user '{username}'")
-        return True
-    
-    return False
+    logger.info(f"Deleted connection '{connection_id}' for user '{username}'")
+    return True
 
 
 def update_last_used(username: str, connection_id: str) -> bool:
@@ -263,34 +463,76 @@ def update_last_used(username: str, connection_id: str) -> bool:
     Returns:
         True if updated successfully
     """
-    connections = _load_connections()
-    
-    if username not in connections or connection_id not in connections[username]:
+    try:
+        cursor = _get_db().execute(
+            "UPDATE wordpress_connections SET last_used = ? WHERE owner = ? AND connection_id = ?",
+            (datetime.now().isoformat(), username, connection_id)
+        )
+    except sqlite3.Error as e:
+        logger.error(f"Error saving connections: {e}")
         return False
     
-    connections[username][connection_id]['last_used'] = datetime.now().isoformat()
+    return cursor.rowcount > 0
+
+
+def update_last_used_many(timestamps: Dict[Tuple[str, str], str]) -> bool:
+    """
+    Update last_used timestamps for many connections in one transaction
+    
+    Older timestamps never overwrite newer ones, so buffers flushed by
+    several server workers in any order keep the latest use.
+    
+    Args:
+        timestamps: Dict mapping (username, connection_id) to ISO timestamp
+    
+    Returns:
+        True if saved successfully
+    """
+    if not timestamps:
+        return True
+    
+    try:
+        conn = _get_db()
+        with _transaction(conn):
+            conn.executemany(
+                "UPDATE wordpress_connections SET last_used = ? WHERE owner = ? AND connection_id = ?"
+                " AND (last_used IS NULL OR last_used < ?)",
+                [(timestamp, username, connection_id, timestamp)
+                 for (username, connection_id), timestamp in timestamps.items()]
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Error saving connections: {e}")
+        return False
     
-    return _save_connections(connections)
+    return True
 
 
-def get_all_enabled_connections() -> Dict[str, Dict]:
+def get_all_enabled_connections(decrypt: bool = True) -> Dict[str, Dict]:
     """
     Get all enabled connections across all users
     Useful for MCP server initialization
     
+    Args:
+        decrypt: Decrypt passwords (False keeps them encrypted, see decrypt_password)
+    
     Returns:
         Dict mapping connection_id to connection data (with decrypted passwords)
     """
-    connections = _load_connections()
-    result = {}
+    try:
+        rows = _get_db().execute(
+            "SELECT * FROM wordpress_connections WHERE enabled = 1 ORDER BY rowid"
+        ).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error loading connections: {e}")
+        return {}
     
-    for username, user_connections in connections.items():
-        for conn_id, conn_data in user_connections.items():
-            if conn_data.get('enabled', True):
-                conn_copy = conn_data.copy()
-                conn_copy['wp_password'] = _decrypt_password(conn_data['wp_password'])
-                conn_copy['owner'] = username
-                result[conn_id] = conn_copy
+    result = {}
+    for row in rows:
+        conn_copy = _row_to_dict(row)
+        if decrypt:
+            conn_copy['wp_password'] = _decrypt_password(row['wp_password'])
+        conn_copy['owner'] = row['owner']
+        result[row['connection_id']] = conn_copy
     
     return result
 
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Runtime profiling helpers for the MCP server
+
+- SamplingProfiler: samples the stacks of all threads from a background
+  thread and dumps them in collapsed ("folded") format, as read by
+  flamegraph.pl, speedscope and inferno
+- tracemalloc helpers: start/stop allocation tracing and list top allocators
+- RequestTimingMiddleware: records per-request timing for selected paths
+  when the client sends a timing header
+"""
+
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Sampling profiler limits
+PROFILE_MAX_SECONDS = 300
+PROFILE_MIN_INTERVAL = 0.001
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler based on sys._current_frames()
+    
+    A daemon thread wakes up every interval seconds and records the stack of
+    every other thread. Only one profiling run can be active at a time.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._interval = 0.005
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self, seconds: float, interval: float = 0.005) -> bool:
+        """
+        Start sampling in the background
+        
+        Args:
+            seconds: Stop automatically after this many seconds (max PROFILE_MAX_SECONDS)
+            interval: Seconds between samples
+        
+        Returns:
+            False if a profiling run is already active
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self._stacks = Counter()
+            self._samples = 0
+            self._interval = max(interval, PROFILE_MIN_INTERVAL)
+            self._started_at = time.monotonic()
+            self._stopped_at = None
+            self._stop.clear()
+            deadline = self._started_at + min(max(seconds, 0), PROFILE_MAX_SECONDS)
+            self._thread = threading.Thread(
+                target=self._run, args=(deadline,), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"Sampling profiler started for {seconds}s (interval {self._interval}s)")
+        return True
+    
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+    
+    def _run(self, deadline: float):
+        """Sampler thread"""
+        own_id = threading.get_ident()
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self._stacks[self._fold(names.get(thread_id, str(thread_id)), frame)] += 1
+            self._samples += 1
+            self._stop.wait(self._interval)
+        self._stopped_at = time.monotonic()
+        logger.info(f"Sampling profiler stopped after {self._samples} samples")
+    
+    @staticmethod
+    def _fold(thread_name: str, frame) -> str:
+        """Collapse a stack into 'thread;outer;...;inner'"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.append(thread_name)
+        return ";".join(reversed(names)).replace(" ", "_")
+    
+    def status(self) -> Dict[str, Any]:
+        """Current profiling run state"""
+        started = self._started_at
+        end = self._stopped_at if self._stopped_at is not None else time.monotonic()
+        return {
+            "running": self.running,
+            "samples": self._samples,
+            "interval": self._interval,
+            "duration": round(end - started, 3) if started is not None else 0
+        }
+    
+    def collapsed(self) -> str:
+        """Stacks of the last run in collapsed format, one 'stack count' per line"""
+        stacks = list(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks))
+
+
+def start_tracemalloc(frames: int = 1) -> bool:
+    """
+    Start allocation tracing
+    
+    Args:
+        frames: Number of frames stored per allocation
+    
+    Returns:
+        False if tracing was already active
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(max(frames, 1))
+    logger.info(f"tracemalloc started ({frames} frames)")
+    return True
+
+
+def stop_tracemalloc() -> bool:
+    """Stop allocation tracing (frees its memory); False if it was not active"""
+    if not tracemalloc.is_tracing():
+        return False
+    tracemalloc.stop()
+    logger.info("tracemalloc stopped")
+    return True
+
+
+def top_allocations(limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+    """
+    Take a snapshot and list the biggest allocators
+    
+    Args:
+        limit: Number of entries
+        group_by: "lineno", "filename" or "traceback"
+    
+    Returns:
+        Dictionary with traced totals and top entries
+    
+    Raises:
+        ValueError: If tracing is not active or group_by is invalid
+    """
+    if not tracemalloc.is_tracing():
+        raise ValueError("tracemalloc is not running, start it first")
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise ValueError(f"Invalid group_by '{group_by}'")
+    
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    stats = snapshot.statistics(group_by)
+    return {
+        "traced_current": current,
+        "traced_peak": peak,
+        "top": [
+            {
+                "size": stat.size,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+            }
+            for stat in stats[:max(limit, 1)]
+        ]
+    }
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing requests to selected path prefixes
+    
+    Only requests carrying the timing header with the expected value are
+    timed. The response gets a Server-Timing header (time to response
+    headers); the full duration, including streamed bodies, is logged and
+    appended to the timings ring buffer.
+    """
+    
+    def __init__(
+        self,
+        app,
+        prefixes: Sequence[str],
+        header: str,
+        token: str,
+        timings: Deque[Dict[str, Any]]
+    ):
+        """
+        Initialize middleware
+        
+        Args:
+            app: Wrapped ASGI app
+            prefixes: Path prefixes to time (e.g. "/sse", "/mcp")
+            header: Request header enabling timing
+            token: Expected header value (empty = timing disabled)
+            timings: Ring buffer receiving one dict per timed request
+        """
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        self.header = header.lower().encode()
+        self.token = token.encode("latin-1")
+        self.timings = timings
+    
+    def _enabled(self, scope) -> bool:
+        if not self.token or scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            return False
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                return hmac.compare_digest(value, self.token)
+        return False
+    
+    async def __call__(self, scope, receive, send):
+        if not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        entry = {
+            "at": datetime.now().isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": None,
+            "headers_ms": None,
+            "total_ms": None,
+            "body_bytes": 0
+        }
+        
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                entry["status"] = message["status"]
+                entry["headers_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", f"app;dur={entry['headers_ms']}".encode()))
+                message = dict(message, headers=headers)
+            elif message["type"] == "http.response.body":
+                entry["body_bytes"] += len(message.get("body", b""))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            entry["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            self.timings.append(entry)
+            logger.info(
+                f"Timing {entry['method']} {entry['path']}: status={entry['status']} "
+                f"headers={entry['headers_ms']}ms total={entry['total_ms']}ms bytes={entry['body_bytes']}"
+            )
@@ -89,6 +89,8 @@ server {
         proxy_set_header X-Real-IP $remote_addr;
         proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
         proxy_set_header X-Forwarded-Proto $scheme;
+        # Caller identity for the MCP server: never pass the client's value
+        proxy_set_header X-MCP-User "";
         proxy_cache_bypass $http_upgrade;
     }
 }
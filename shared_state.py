@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+State shared by the worker processes of the MCP server
+
+Used when the server runs with several uvicorn workers (MCP_WORKERS). A small
+SQLite database (WAL mode) next to the connection store holds:
+
+- generations: counters bumped on changes, so that per-process caches notice
+  writes made by other workers
+- leases: time-limited ownership of background jobs (one mirror sync at a time)
+- sse_sessions / sse_outbox: which worker holds an SSE session stream, and
+  messages POSTed to other workers waiting to be relayed to it
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Storage database
+DATABASE_FILE = Path(__file__).parent / "data" / "shared_state.db"
+DATABASE_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sse_sessions (
+    session_id TEXT PRIMARY KEY,
+    worker TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sse_sessions_worker
+    ON sse_sessions (worker);
+CREATE TABLE IF NOT EXISTS sse_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sse_outbox_session
+    ON sse_outbox (session_id)
+"""
+
+# Schema version stored in PRAGMA user_version
+_SCHEMA_VERSION = 1
+
+# One SQLite connection per thread
+_local = threading.local()
+
+
+def _get_db() -> sqlite3.Connection:
+    """Get SQLite connection for the current thread (initializes the database)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DATABASE_FILE:
+        return conn
+    
+    # Callers run in threads (asyncio.to_thread) and transactions are tiny,
+    # so a short busy timeout is enough
+    conn = sqlite3.connect(str(DATABASE_FILE), timeout=5.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _init_db(conn)
+    
+    _local.conn = conn
+    _local.path = DATABASE_FILE
+    return conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection):
+    """Run a write transaction (takes the write lock up front)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _init_db(conn: sqlite3.Connection):
+    """Create schema"""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    
+    with _transaction(conn):
+        # Another process may have finished initialization meanwhile
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+# ========================================
+# GENERATIONS
+# ========================================
+
+def get_generation(key: str) -> int:
+    """
+    Get the current generation of a key
+    
+    Args:
+        key: Name of the shared state (e.g. "read_cache:<site url>")
+    
+    Returns:
+        Generation number (0 if never bumped)
+    """
+    row = _get_db().execute("SELECT value FROM generations WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else 0
+
+
+def bump_generation(key: str) -> int:
+    """
+    Mark a key as changed in all workers
+    
+    Args:
+        key: Name of the shared state
+    
+    Returns:
+        New generation number
+    """
+    conn = _get_db()
+    with _transaction(conn):
+        conn.execute(
+            "INSERT INTO generations (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (key,)
+        )
+        return conn.execute("SELECT value FROM generations WHERE key = ?", (key,)).fetchone()[0]
+
+
+# ========================================
+# LEASES
+# ========================================
+
+def acquire_lease(name: str, owner: str, ttl: float) -> bool:
+    """
+    Take or renew a lease
+    
+    A lease can be taken when it is free, expired or already held by owner.
+    
+    Args:
+        name: Lease name (e.g. "post_mirror_sync")
+        owner: Worker ID
+        ttl: Seconds until the lease expires unless renewed
+    
+    Returns:
+        True if owner holds the lease now
+    """
+    now = time.time()
+    conn = _get_db()
+    with _transaction(conn):
+        cursor = conn.execute(
+            "INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+            "WHERE leases.owner = excluded.owner OR leases.expires < ?",
+            (name, owner, now + ttl, now)
+        )
+        return cursor.rowcount > 0
+
+
+def release_lease(name: str, owner: str):
+    """Give up a lease held by owner"""
+    _get_db().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+# ========================================
+# SSE SESSION ROUTING
+# ========================================
+
+def register_session(session_id: str, worker: str):
+    """Record that worker holds the stream of a session"""
+    _get_db().execute(
+        "INSERT OR REPLACE INTO sse_sessions (session_id, worker, updated) VALUES (?, ?, ?)",
+        (session_id, worker, time.time())
+    )
+
+
+def unregister_session(session_id: str):
+    """Forget a closed session and its undelivered messages"""
+    conn = _get_db()
+    with _transaction(conn):
+        conn.execute("DELETE FROM sse_sessions WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sse_outbox WHERE session_id = ?", (session_id,))
+
+
+def session_worker(session_id: str) -> Optional[str]:
+    """Get the worker holding a session stream (None if unknown)"""
+    row = _get_db().execute("SELECT worker FROM sse_sessions WHERE session_id = ?", (session_id,)).fetchone()
+    return row[0] if row else None
+
+
+def enqueue_message(session_id: str, payload: str):
+    """Queue a raw JSON-RPC message for the worker holding the session"""
+    _get_db().execute(
+        "INSERT INTO sse_outbox (session_id, payload, created) VALUES (?, ?, ?)",
+        (session_id, payload, time.time())
+    )
+
+
+def take_messages(worker: str) -> List[Tuple[str, str]]:
+    """
+    Remove and return queued messages for the sessions of a worker
+    
+    Args:
+        worker: Worker ID
+    
+    Returns:
+        List of (session_id, payload) in arrival order
+    """
+    # Only the owning worker takes messages of its sessions, so reading
+    # outside the write transaction cannot hand a message out twice
+    conn = _get_db()
+    rows = conn.execute(
+        "SELECT id, session_id, payload FROM sse_outbox WHERE session_id IN "
+        "(SELECT session_id FROM sse_sessions WHERE worker = ?) ORDER BY id",
+        (worker,)
+    ).fetchall()
+    if rows:
+        with _transaction(conn):
+            conn.executemany("DELETE FROM sse_outbox WHERE id = ?", [(row[0],) for row in rows])
+    return [(session_id, payload) for _, session_id, payload in rows]
+
+
+def heartbeat_sessions(worker: str, stale_after: float) -> Dict[str, int]:
+    """
+    Mark the sessions of a live worker and drop sessions of dead workers
+    
+    Args:
+        worker: Worker ID
+        stale_after: Seconds without heartbeat after which a session is dropped
+    
+    Returns:
+        Dictionary with numbers of dropped sessions and messages
+    """
+    now = time.time()
+    conn = _get_db()
+    with _transaction(conn):
+        conn.execute("UPDATE sse_sessions SET updated = ? WHERE worker = ?", (now, worker))
+        sessions = conn.execute("DELETE FROM sse_sessions WHERE updated < ?", (now - stale_after,)).rowcount
+        messages = conn.execute(
+            "DELETE FROM sse_outbox WHERE created < ? OR session_id NOT IN (SELECT session_id FROM sse_sessions)",
+            (now - stale_after,)
+        ).rowcount
+    if sessions or messages:
+        logger.info(f"Dropped {sessions} stale SSE sessions and {messages} undelivered messages")
+    return {"sessions": sessions, "messages": messages}
+
@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Local mirror of WordPress posts
+Keeps a SQLite copy of every post on each site so that read tools can be
+served without calling the (slow, rate-limited) WordPress hosts
+
+The first sync of a site pulls all posts; later syncs only fetch posts
+changed since the newest known modification date (modified_after with
+orderby=modified). A periodic full sync removes posts deleted on the site.
+Full syncs walk the posts by ID: with orderby=modified a post edited during
+the walk moves to the last page and others shift into pages already read.
+
+Title, excerpt and content (as plain text) are indexed with SQLite FTS5
+for search_posts().
+"""
+
+import asyncio
+import html
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Storage database
+DATABASE_FILE = Path(__file__).parent / "data" / "post_mirror.db"
+DATABASE_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+# Post fields stored in the mirror (same names as get_posts fields)
+MIRROR_FIELDS = (
+    "id",
+    "title",
+    "excerpt",
+    "content",
+    "url",
+    "status",
+    "date",
+    "modified",
+    "slug",
+    "author",
+    "categories",
+    "tags",
+    "featured_media"
+)
+
+# Fields stored as JSON text
+_JSON_FIELDS = ("categories", "tags")
+
+# Post statuses pulled from WordPress (trashed posts are dropped from the mirror)
+MIRROR_STATUSES = "publish,future,draft,pending,private"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    site_id TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    title TEXT,
+    excerpt TEXT,
+    content TEXT,
+    url TEXT,
+    status TEXT,
+    date TEXT,
+    modified TEXT,
+    slug TEXT,
+    author INTEGER,
+    categories TEXT,
+    tags TEXT,
+    featured_media INTEGER,
+    PRIMARY KEY (site_id, post_id)
+);
+CREATE INDEX IF NOT EXISTS idx_posts_site_status_date
+    ON posts (site_id, status, date DESC, post_id DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    site_id TEXT PRIMARY KEY,
+    site_url TEXT,
+    last_modified TEXT,
+    last_sync REAL,
+    last_full_sync REAL
+)
+"""
+
+# Full-text index (rowid = posts.rowid), rows are written by upsert_posts()
+_FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    title,
+    excerpt,
+    content,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# Deleted posts leave the index via trigger (reset_site, delete_post, full sync)
+_FTS_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    DELETE FROM posts_fts WHERE rowid = old.rowid;
+END
+"""
+
+# Schema version stored in PRAGMA user_version
+_SCHEMA_VERSION = 1
+
+# Relative weights of title, excerpt and content in search ranking (bm25)
+_SEARCH_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+# One SQLite connection per thread
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_path: Optional[Path] = None
+
+
+def _get_db() -> sqlite3.Connection:
+    """Get SQLite connection for the current thread (initializes the database)"""
+    global _initialized_path
+    
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DATABASE_FILE:
+        return conn
+    
+    conn = sqlite3.connect(str(DATABASE_FILE), timeout=30.0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    
+    with _init_lock:
+        if _initialized_path != DATABASE_FILE:
+            _init_db(conn)
+            _initialized_path = DATABASE_FILE
+    
+    _local.conn = conn
+    _local.path = DATABASE_FILE
+    return conn
+
+
+def _init_db(conn: sqlite3.Connection):
+    """Create schema and build the full-text index of existing posts once"""
+    for statement in _SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            conn.execute(_FTS_TABLE)
+            conn.execute(_FTS_DELETE_TRIGGER)
+            rows = conn.execute("SELECT rowid, title, excerpt, content FROM posts").fetchall()
+            _index_rows(conn, rows)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def html_to_text(value: Optional[str]) -> str:
+    """Strip tags and entities from rendered HTML"""
+    if not value:
+        return ""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def _index_rows(conn: sqlite3.Connection, rows):
+    """Write (rowid, title, excerpt, content) rows to the full-text index"""
+    conn.executemany("DELETE FROM posts_fts WHERE rowid = ?", [(row[0],) for row in rows])
+    conn.executemany(
+        "INSERT INTO posts_fts (rowid, title, excerpt, content) VALUES (?, ?, ?, ?)",
+        [(row[0], html_to_text(row[1]), html_to_text(row[2]), html_to_text(row[3])) for row in rows]
+    )
+
+
+def _post_row(site_id: str, post: Dict[str, Any]) -> tuple:
+    """Convert post dict (get_posts fields) to a database row"""
+    values = []
+    for field in MIRROR_FIELDS:
+        value = post.get(field)
+        if field in _JSON_FIELDS and value is not None:
+            value = json.dumps(value)
+        values.append(value)
+    return (site_id, *values)
+
+
+def _row_to_post(row: sqlite3.Row, fields) -> Dict[str, Any]:
+    """Convert database row to post dict with the requested fields"""
+    post = {}
+    for field in fields:
+        value = row["post_id"] if field == "id" else row[field]
+        if field in _JSON_FIELDS and value is not None:
+            value = json.loads(value)
+        post[field] = value
+    return post
+
+
+def upsert_posts(site_id: str, posts: List[Dict[str, Any]]):
+    """
+    Insert or update posts of a site
+    
+    Args:
+        site_id: Site ID
+        posts: Post dicts with MIRROR_FIELDS (as returned by get_posts)
+    """
+    if not posts:
+        return
+    
+    columns = ("site_id", "post_id") + MIRROR_FIELDS[1:]
+    conn = _get_db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Upsert keeps the rowid stable, which is also the full-text index key
+        conn.executemany(
+            f"INSERT INTO posts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (site_id, post_id) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in columns[2:]),
+            [_post_row(site_id, post) for post in posts]
+        )
+        rows = []
+        for post in posts:
+            rowid = conn.execute(
+                "SELECT rowid FROM posts WHERE site_id = ? AND post_id = ?",
+                (site_id, post["id"])
+            ).fetchone()[0]
+            rows.append((rowid, post.get("title"), post.get("excerpt"), post.get("content")))
+        _index_rows(conn, rows)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def delete_post(site_id: str, post_id: int):
+    """
+    Remove a post from the mirror
+    
+    Args:
+        site_id: Site ID
+        post_id: Post ID
+    """
+    _get_db().execute("DELETE FROM posts WHERE site_id = ? AND post_id = ?", (site_id, post_id))
+
+
+def reset_site(site_id: str):
+    """
+    Drop all mirrored posts and the sync state of a site
+    
+    Args:
+        site_id: Site ID
+    """
+    conn = _get_db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM posts WHERE site_id = ?", (site_id,))
+        conn.execute("DELETE FROM sync_state WHERE site_id = ?", (site_id,))
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def get_sync_state(site_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get sync state of a site
+    
+    Args:
+        site_id: Site ID
+    
+    Returns:
+        Dict with site_url, last_modified, last_sync and last_full_sync, or None
+    """
+    row = _get_db().execute("SELECT * FROM sync_state WHERE site_id = ?", (site_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def is_synced(site_id: str) -> bool:
+    """Check whether the site finished at least one full sync"""
+    state = get_sync_state(site_id)
+    return bool(state and state["last_full_sync"])
+
+
+def synced_sites(site_ids: List[str]) -> List[str]:
+    """
+    Filter sites down to those that finished at least one full sync
+    
+    Args:
+        site_ids: Site IDs to check
+    
+    Returns:
+        Synced site IDs, in input order
+    """
+    synced = {
+        row[0] for row in _get_db().execute("SELECT site_id FROM sync_state WHERE last_full_sync IS NOT NULL")
+    }
+    return [site_id for site_id in site_ids if site_id in synced]
+
+
+def query_posts(
+    site_id: str,
+    per_page: int = 10,
+    page: int = 1,
+    fields=("id", "title", "excerpt", "url", "status", "date"),
+    status: str = "publish"
+) -> Dict[str, Any]:
+    """
+    Get a page of mirrored posts, ordered like the WordPress REST API (newest first)
+    
+    Args:
+        site_id: Site ID
+        per_page: Number of posts per page (1-100)
+        page: Page number
+        fields: Post fields to return (subset of MIRROR_FIELDS)
+        status: Post status to return
+    
+    Returns:
+        Dictionary with success status, posts list, count, page, total,
+        total_pages, and message (same shape as WordPressMCP.get_posts)
+    """
+    per_page = min(max(per_page, 1), 100)
+    page = max(page, 1)
+    conn = _get_db()
+    
+    total = conn.execute(
+        "SELECT COUNT(*) FROM posts WHERE site_id = ? AND status = ?",
+        (site_id, status)
+    ).fetchone()[0]
+    rows = conn.execute(
+        "SELECT * FROM posts WHERE site_id = ? AND status = ? "
+        "ORDER BY date DESC, post_id DESC LIMIT ? OFFSET ?",
+        (site_id, status, per_page, (page - 1) * per_page)
+    ).fetchall()
+    
+    post_list = [_row_to_post(row, fields) for row in rows]
+    total_pages = (total + per_page - 1) // per_page
+    
+    return {
+        "success": True,
+        "posts": post_list,
+        "count": len(post_list),
+        "page": page,
+        "total": total,
+        "total_pages": total_pages,
+        "next_page": page + 1 if page < total_pages else None,
+        "message": f"Retrieved {len(post_list)} posts"
+    }
+
+
+def _save_sync_state(site_id: str, site_url: str, last_modified: Optional[str], full: bool):
+    """Store sync progress of a site"""
+    now = time.time()
+    _get_db().execute(
+        "INSERT INTO sync_state (site_id, site_url, last_modified, last_sync, last_full_sync) "
+        "VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (site_id) DO UPDATE SET site_url = excluded.site_url, "
+        "last_modified = excluded.last_modified, last_sync = excluded.last_sync, "
+        "last_full_sync = COALESCE(excluded.last_full_sync, sync_state.last_full_sync)",
+        (site_id, site_url, last_modified, now, now if full else None)
+    )
+
+
+def _missing_post_ids(site_id: str, seen_ids: set) -> List[int]:
+    """Get IDs of mirrored posts of a site that were not seen during a full sync"""
+    stored = _get_db().execute("SELECT post_id FROM posts WHERE site_id = ?", (site_id,))
+    return [row[0] for row in stored if row[0] not in seen_ids]
+
+
+def _delete_posts(site_id: str, post_ids: List[int]) -> int:
+    """Delete mirrored posts of a site"""
+    if post_ids:
+        _get_db().executemany(
+            "DELETE FROM posts WHERE site_id = ? AND post_id = ?",
+            [(site_id, post_id) for post_id in post_ids]
+        )
+    return len(post_ids)
+
+
+def _modified_after(last_modified: str) -> str:
+    """
+    Watermark for incremental syncs
+    
+    modified_after is exclusive and has second precision, so step back one
+    second to pick up posts changed within the same second (upserts are idempotent).
+    """
+    return (datetime.fromisoformat(last_modified) - timedelta(seconds=1)).isoformat()
+
+
+async def sync_site(
+    site_id: str,
+    site_url: str,
+    client: Any,
+    full_sync_interval: float = 86400
+) -> Dict[str, Any]:
+    """
+    Bring the mirror of one site up to date
+    
+    Args:
+        site_id: Site ID
+        site_url: Site URL (a changed URL resets the site's mirror)
+        client: WordPressMCP client of the site
+        full_sync_interval: Seconds between full syncs that also detect deleted posts
+    
+    Returns:
+        Dict with mode ("full" or "incremental"), fetched and deleted counts
+    """
+    state = await asyncio.to_thread(get_sync_state, site_id)
+    if state and state["site_url"] != site_url:
+        logger.info(f"Site URL changed for '{site_id}', resetting mirror")
+        await asyncio.to_thread(reset_site, site_id)
+        state = None
+    
+    full = (
+        not state
+        or not state["last_full_sync"]
+        or not state["last_modified"]
+        or time.time() - state["last_full_sync"] >= full_sync_interval
+    )
+    
+    last_modified = state["last_modified"] if state else None
+    seen_ids = set()
+    fetched = 0
+    
+    async def save(posts: List[Dict[str, Any]]):
+        """Store fetched posts in the mirror"""
+        nonlocal last_modified, fetched
+        await asyncio.to_thread(upsert_posts, site_id, posts)
+        fetched += len(posts)
+        for post in posts:
+            seen_ids.add(post["id"])
+            if post.get("modified") and (last_modified is None or post["modified"] > last_modified):
+                last_modified = post["modified"]
+        # Save progress so an interrupted incremental sync resumes from here
+        if not full:
+            await asyncio.to_thread(_save_sync_state, site_id, site_url, last_modified, False)
+    
+    async def store(query: Dict[str, Any]):
+        """Fetch all pages of a query into the mirror"""
+        pages = client.iter_post_pages(per_page=100, fields=list(MIRROR_FIELDS), query=query, cache=False)
+        async with aclosing(pages):
+            async for result in pages:
+                if result["posts"]:
+                    await save(result["posts"])
+    
+    async def store_modified():
+        """
+        Fetch posts modified since last_modified into the mirror
+        
+        Offset pages over orderby=modified shift when a post is edited during
+        the walk (it moves to the end), so the post at a page boundary would
+        be skipped. Each page is asked for again from the newest modified
+        time seen; offsets are only used while a whole page shares that time.
+        """
+        watermark = last_modified
+        page = 1
+        versions = set()
+        while True:
+            query = {
+                "orderby": "modified",
+                "order": "asc",
+                "status": MIRROR_STATUSES,
+                "modified_after": _modified_after(watermark)
+            }
+            pages = client.iter_post_pages(
+                per_page=100, start_page=page, fields=list(MIRROR_FIELDS), max_pages=1, query=query, cache=False
+            )
+            async with aclosing(pages):
+                result = await anext(pages)
+            # Pages overlap by the second stepped back in _modified_after
+            posts = [post for post in result["posts"] if (post["id"], post.get("modified")) not in versions]
+            versions.update((post["id"], post.get("modified")) for post in result["posts"])
+            if posts:
+                await save(posts)
+            if not result.get("next_page"):
+                break
+            if last_modified > watermark:
+                watermark, page = last_modified, 1
+            else:
+                page += 1
+    
+    if full:
+        # IDs never change, so offset pages stay stable while posts are edited
+        await store({"orderby": "id", "order": "asc", "status": MIRROR_STATUSES})
+    else:
+        await store_modified()
+    
+    deleted = 0
+    if full:
+        missing = await asyncio.to_thread(_missing_post_ids, site_id, seen_ids)
+        # Posts deleted during the walk shift later ones into pages already
+        # read, so ask for the unseen posts by ID before dropping them
+        for start in range(0, len(missing), 100):
+            await store({"include": ",".join(map(str, missing[start:start + 100])), "status": MIRROR_STATUSES})
+        deleted = await asyncio.to_thread(
+            _delete_posts, site_id, [post_id for post_id in missing if post_id not in seen_ids]
+        )
+    await asyncio.to_thread(_save_sync_state, site_id, site_url, last_modified, full)
+    
+    mode = "full" if full else "incremental"
+    logger.info(f"Mirror sync of '{site_id}' ({mode}): {fetched} posts fetched, {deleted} deleted")
+    return {"mode": mode, "fetched": fetched, "deleted": deleted}
+
+
+def get_mirrored_sites() -> List[str]:
+    """
+    Get IDs of all sites that have a sync state
+    
+    Returns:
+        List of site IDs
+    """
+    return [row[0] for row in _get_db().execute("SELECT site_id FROM sync_state")]
+
+
+def _match_expression(query: str) -> str:
+    """Build FTS5 MATCH expression (all words, prefix match) from free text"""
+    return " ".join(f'"{word}"*' for word in _WORD_RE.findall(query))
+
+
+def search_posts(
+    query: str,
+    site_ids: Optional[List[str]] = None,
+    limit: int = 10,
+    status: str = "publish",
+    any_status_site_ids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search over mirrored posts
+    
+    Args:
+        query: Search words (all must match, prefixes allowed)
+        site_ids: Sites to search (None = all mirrored sites)
+        limit: Maximum number of results
+        status: Post status to search
+        any_status_site_ids: Sites whose posts match in every mirrored status
+            (drafts, private, ...), e.g. the caller's own sites
+    
+    Returns:
+        List of dicts with site_id, id, title, url, status, date, snippet and
+        score, best matches first
+    """
+    match = _match_expression(query)
+    if not match:
+        return []
+    
+    sql = (
+        "SELECT p.site_id, p.post_id, p.title, p.url, p.status, p.date, "
+        "snippet(posts_fts, -1, '**', '**', '…', 16) AS snippet, "
+        f"bm25(posts_fts, {', '.join(str(weight) for weight in _SEARCH_WEIGHTS)}) AS score "
+        "FROM posts_fts JOIN posts p ON p.rowid = posts_fts.rowid "
+        "WHERE posts_fts MATCH ?"
+    )
+    params: List[Any] = [match]
+    if any_status_site_ids:
+        sql += f" AND (p.status = ? OR p.site_id IN ({', '.join('?' * len(any_status_site_ids))}))"
+        params.append(status)
+        params.extend(any_status_site_ids)
+    else:
+        sql += " AND p.status = ?"
+        params.append(status)
+    if site_ids is not None:
+        if not site_ids:
+            return []
+        sql += f" AND p.site_id IN ({', '.join('?' * len(site_ids))})"
+        params.extend(site_ids)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(max(limit, 1))
+    
+    return [
+        {
+            "site_id": row["site_id"],
+            "id": row["post_id"],
+            "title": row["title"],
+            "url": row["url"],
+            "status": row["status"],
+            "date": row["date"],
+            "snippet": row["snippet"],
+            # bm25() is lower for better matches
+            "score": round(-row["score"], 4)
+        }
+        for row in _get_db().execute(sql, params)
+    ]